@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# AWB - benchmarks for the AWE/AWC hot paths. Runs headless against a throwaway library.
+#
+#   python AWB.py [--projects 200] [--layers 500] [--canvas 3840x2160] [--repeat 20]
+#                 [--out results.json] [--baseline base.json] [--save-baseline base.json]
+#
+# With --baseline it exits 1 when a benchmark's median got slower than the baseline by more than --tolerance.
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Everything AWE touches lives under $HOME, so point it somewhere disposable before AWE is imported
+_BENCH_HOME = Path(tempfile.mkdtemp(prefix="awb-"))
+os.environ["HOME"] = str(_BENCH_HOME)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QStyleOptionViewItem, QStyle
+from PySide6.QtGui import QImage, QColor, QPainter
+from PySide6.QtCore import QRect, QThreadPool, qVersion
+
+import AWE
+import AWC
+from project import ProjectIndex, ProjectStore, History, write_manifest, create_canvas, TILE_SIZE
+
+
+# Medians this close are noise whatever the ratio says
+NOISE_FLOOR_MS = 0.05
+
+
+def _manifest(project_id: str, name: str, width: int, height: int, layers: int) -> dict:
+    rng = random.Random(project_id)
+    stack = [{"id": 0, "name": "Canvas", "type": "canvas", "source": "canvas", "tile_size": TILE_SIZE}]
+    for i in range(1, layers + 1):
+        w = rng.randint(width // 64, width // 4)
+        h = rng.randint(height // 64, height // 4)
+        stack.append({
+            "id": i,
+            "name": f"Layer {i}",
+            "type": "solid_color",
+            "color": f"#{rng.randrange(1 << 24):06x}",
+            "visible": True,
+            "position": {"x": rng.randrange(width - w), "y": rng.randrange(height - h)},
+            "size": {"width": w, "height": h},
+        })
+    return {
+        "id": project_id,
+        "name": name,
+        "format_version": "1.0.0",
+        "editor_version": AWE.AWE_VERSION,
+        "resolution": {"width": width, "height": height},
+        "layers": stack,
+        "properties": {},
+    }
+
+
+def generate_library(projects: int, layers: int, canvas_w: int, canvas_h: int) -> Path:
+    # N small projects for the launcher, plus one big one (large canvas, M layers) for the editor
+    AWE.PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
+    preview = QImage(AWE.SIDEBAR_PREVIEW_W, AWE.SIDEBAR_PREVIEW_H, QImage.Format.Format_RGB32)
+    for i in range(projects):
+        project_id = f"bench-{i:05d}"
+        project_dir = AWE.PROJECTS_DIR / project_id
+        project_dir.mkdir()
+        preview.fill(QColor.fromHsv(i * 37 % 360, 160, 200))
+        preview.save(str(project_dir / "preview.png"))
+        write_manifest(project_dir, _manifest(project_id, f"Bench {i}", 1920, 1080, 1))
+
+    editor_dir = AWE.PROJECTS_DIR / "bench-editor"
+    editor_dir.mkdir()
+    create_canvas(editor_dir)
+    AWE.generate_red_preview(editor_dir / "preview.png")
+    write_manifest(editor_dir, _manifest("bench-editor", "Bench Editor", canvas_w, canvas_h, layers))
+    return editor_dir
+
+
+def timed(fn, repeat: int, setup=None) -> dict:
+    fn() if setup is None else (setup(), fn())  # warm-up
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(runs), 4),
+        "min_ms": round(min(runs), 4),
+        "mean_ms": round(statistics.fmean(runs), 4),
+        "runs": repeat,
+    }
+
+
+def bench_launcher(app, repeat: int) -> dict:
+    results = {}
+    window = AWE.MainWindow()
+    window.resize(1200, 800)
+    window.show()
+    app.processEvents()
+
+    def drop_index():
+        AWE.INDEX_PATH.unlink(missing_ok=True)
+        window._index = ProjectIndex(AWE.PROJECTS_DIR, AWE.INDEX_PATH)
+
+    results["awe.scan_projects.cold"] = timed(window._scan_projects, repeat, setup=drop_index)
+    results["awe.scan_projects.warm"] = timed(window._scan_projects, repeat)
+    results["awe.refresh_grid"] = timed(window._refresh_grid, repeat)
+
+    # Cards come out of the delegate now (there's no per-card widget anymore); paint a screenful
+    QThreadPool.globalInstance().waitForDone()
+    app.processEvents()
+    view = window._grid_view
+    model = window._grid_model
+    delegate = view.itemDelegate()
+    option = QStyleOptionViewItem()
+    size = delegate.sizeHint(option, model.index(0))
+    target = QImage(size.width(), size.height(), QImage.Format.Format_ARGB32_Premultiplied)
+    cards = [model.index(row) for row in range(min(model.rowCount(), 60))]
+
+    def paint_cards():
+        painter = QPainter(target)
+        for i, index in enumerate(cards):
+            option.rect = QRect(0, 0, size.width(), size.height())
+            option.state = QStyle.StateFlag.State_Selected if i == 0 else QStyle.StateFlag.State_None
+            delegate.paint(painter, option, index)
+        painter.end()
+
+    results["awe.paint_cards"] = timed(paint_cards, repeat)
+
+    paths = [model.path_at(index) for index in cards]
+    cycle = iter(paths * (repeat + 1))
+    results["awe.select_project"] = timed(lambda: window._select_project(next(cycle)), repeat)
+
+    window._watcher.deleteLater()
+    window.close()
+    return results
+
+
+def bench_editor(app, project_dir: Path, repeat: int) -> dict:
+    results = {}
+    store = ProjectStore(project_dir)
+    view = AWC.CanvasView(project_dir, store.layers)
+    view.resize(1400, 800)
+    view.show()
+    app.processEvents()
+
+    dpr = view.devicePixelRatioF()
+    results["awc.build_hex_cache"] = timed(lambda: view._build_hex_cache(dpr), repeat)
+    results["awc.paint_full"] = timed(view.repaint, repeat)
+
+    layer_ids = [layer.id for layer in store.layers if not layer.is_canvas]
+    rng = random.Random(0)
+    picks = iter([rng.choice(layer_ids) for _ in range(2 * repeat + 2)])
+    state = {}
+    # Same path as the editor's checkbox: applied through the undo history
+    history = History(store)
+
+    def toggle():
+        layer_id = next(picks)
+        visible = not store.layers.get(layer_id).is_visible
+        history.set_attrs(layer_id, {"visible": visible})
+        state["last"] = layer_id
+
+    results["awc.toggle_layer_visibility"] = timed(toggle, repeat)
+
+    def paint_layer():
+        # The repaint a visibility toggle actually costs now: just that layer's old/new rect
+        layer_id = state["last"]
+        rect = view._layer_rect(store.layers.get(layer_id)).toAlignedRect().adjusted(-2, -2, 2, 2)
+        view.repaint(rect)
+
+    results["awc.paint_layer"] = timed(paint_layer, repeat, setup=toggle)
+
+    view.close()
+    store._timer.stop()
+    store._executor.shutdown(wait=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    # Table goes to stderr so stdout stays clean JSON when there's no --out
+    print(f"{'benchmark':<32}{'baseline':>12}{'now':>12}{'change':>10}", file=sys.stderr)
+    for name, now in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<32}{'-':>12}{now['median_ms']:>12.3f}{'new':>10}", file=sys.stderr)
+            continue
+        before, after = base["median_ms"], now["median_ms"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if after - before > NOISE_FLOOR_MS and change > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<32}{before:>12.3f}{after:>12.3f}{change:>+9.0%}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark AWE/AWC hot paths headlessly.")
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--layers", type=int, default=500)
+    parser.add_argument("--canvas", default="3840x2160", help="WxH of the editor project")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", type=Path, help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", type=Path, help="compare against this results JSON")
+    parser.add_argument("--save-baseline", type=Path, help="also write the results here as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    args = parser.parse_args(argv)
+
+    canvas_w, canvas_h = (int(v) for v in args.canvas.lower().split("x"))
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    app.setStyleSheet(AWE.DARK_STYLE)
+
+    editor_dir = generate_library(args.projects, args.layers, canvas_w, canvas_h)
+    results = {}
+    results.update(bench_launcher(app, args.repeat))
+    results.update(bench_editor(app, editor_dir, args.repeat))
+
+    report = {
+        "meta": {
+            "projects": args.projects,
+            "layers": args.layers,
+            "canvas": [canvas_w, canvas_h],
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "qt": qVersion(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(payload)
+    else:
+        print(payload)
+    if args.save_baseline:
+        args.save_baseline.write_text(payload)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("meta", {}).get("layers") != args.layers or \
+                baseline.get("meta", {}).get("projects") != args.projects:
+            print("warning: baseline was recorded with a different library size", file=sys.stderr)
+        regressions = compare(results, baseline.get("results", {}), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        code = main()
+    finally:
+        import shutil
+        shutil.rmtree(_BENCH_HOME, ignore_errors=True)
+    sys.exit(code)
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
-import json
+import time
+_T_START = time.perf_counter()
+
 import math
 import subprocess
 import sys
@@ -8,16 +10,32 @@ from pathlib import Path
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget,
     QLabel, QVBoxLayout, QHBoxLayout, QFrame, QSplitter,
-    QPushButton, QMenu, QCheckBox,
+    QPushButton, QMenu, QCheckBox, QMessageBox, QFileDialog, QInputDialog, QProgressDialog,
+)
+from PySide6.QtGui import QPainter, QColor, QPixmap, QPolygonF, QBrush, QRegion, QPen, QKeySequence
+from PySide6.QtCore import Qt, QPointF, QRect, QRectF, QTimer, Signal
+
+from layers import (
+    AddLayerDialog, LayerStack, RectLayer, SolidColorLayer, ImageLayer, VideoLayer, AudioReactiveLayer, LayerGrid,
+    topmost_layer_at, layers_to_mime, layer_dicts_from_mime, layers_from_dicts, missing_assets, PasteJob,
+)
+from project import (
+    ProjectStore, History, TiledCanvas, is_tiled, assets_for, read_summary, manifest_path, BUNDLE_NAME,
+    CloneJob, new_project_dir,
 )
-from PySide6.QtGui import QPainter, QColor, QPixmap, QPolygonF
-from PySide6.QtCore import Qt, QPointF, QRectF
+from render import PreviewRegenerator, TilePyramid, TileMemory, VideoPlayer, ExportJob
+from timing import startup, parse_profile_flag, trace, parse_trace_flag
 
-from layers import AddLayerDialog, toggle_layer_visibility
+_T_IMPORTED = time.perf_counter()
 
 #TODO: Pull the theme from config
 
 AWE_PATH = Path(__file__).parent / "AWE.py"
+# Same cache root AWE uses for thumbnails
+PYRAMID_CACHE = Path.home() / ".cache" / "AWE" / "pyramid"
+VIDEO_SUFFIXES = {".mp4", ".webm", ".mkv", ".mov"}
+# Video layers re-decode at their new size once a resize has been still this long; until then frames get scaled
+VIDEO_RESIZE_DEBOUNCE_MS = 250
 
 BTN_BG = "#2a2a2a"
 BTN_TEXT = "#e1e1e1"
@@ -89,32 +107,71 @@ HEX_RADIUS = 12
 
 
 class CanvasView(QWidget):
+    # Layer id of the clicked layer, or None when the click hit nothing
+    selection_changed = Signal(object)
+    # Dragging the selected layer: (layer id, new x, new y) in canvas pixels, then drag_finished on release
+    layer_dragged = Signal(object, int, int)
+    drag_finished = Signal()
+    # A layer that can't be drawn here, and why; each reason is only sent once per view
+    media_unavailable = Signal(str)
 
-    def __init__(self, project_path: Path, layers: list):
+    def __init__(self, project_path: Path, layers: LayerStack, resolution: dict | None = None):
         super().__init__()
         self._layers = layers
+        self._colors: dict[str, QColor] = {}
         self._scale = 1.0
         self._offset_x = 0.0
         self._offset_y = 0.0
+        # (layer id, press point, layer origin) while a drag is going
+        self._drag = None
 
-        canvas_path = project_path / "canvas.png"
-        if canvas_path.exists():
-            self._canvas_pixmap = QPixmap(str(canvas_path))
-            self._canvas_w = self._canvas_pixmap.width()
-            self._canvas_h = self._canvas_pixmap.height()
-        else:
-            try:
-                data = json.loads((project_path / "project.json").read_text())
-                res = data.get("resolution", {})
-                self._canvas_w = res.get("width", 1920)
-                self._canvas_h = res.get("height", 1080)
-            except (json.JSONDecodeError, OSError):
-                self._canvas_w = 1920
-                self._canvas_h = 1080
-            self._canvas_pixmap = None
+        if resolution is None:
+            # Header only, even for a bundle; "?" is the summary's placeholder for a missing value
+            summary = read_summary(project_path) or {}
+            resolution = {k: v for k, v in summary.get("resolution", {}).items() if v != "?"}
+        resolution = resolution or {}
+        self._canvas_w = resolution.get("width", 1920)
+        self._canvas_h = resolution.get("height", 1080)
+
+        canvas_layer = next((layer for layer in layers if layer.is_canvas), None)
+        canvas_path = project_path / (canvas_layer.source if canvas_layer and canvas_layer.source else "canvas.png")
+        # Image layers point into the library's shared asset store; one pyramid per asset
+        self._assets = assets_for(project_path)
+        self._image_pyramids: dict = {}
+        # One tile budget for the canvas and every image on it, however many there are
+        self._tile_memory = TileMemory()
+        # layer id -> VideoPlayer, only for video layers that have been on screen
+        self._video_players: dict = {}
+        self._media_reported: set = set()
+        self._video_resize = QTimer(self)
+        self._video_resize.setSingleShot(True)
+        self._video_resize.setInterval(VIDEO_RESIZE_DEBOUNCE_MS)
+        self._video_resize.timeout.connect(self._resize_videos)
+        # audio source (asset hash, None = live) -> [analyzer, bands buffer, auto-gain peak, last generation]
+        self._audio: dict = {}
+        self._audio_timer = QTimer(self)
+        self._audio_timer.setInterval(16)
+        self._audio_timer.timeout.connect(self._on_audio_tick)
+
+        # Drawn through a mip pyramid either way; tiles/pixels are only read as a paint needs them
+        self._canvas_pyramid = None
+        if is_tiled(canvas_path):
+            tiles = TiledCanvas(canvas_path, self._canvas_w, self._canvas_h, canvas_layer.tile_size)
+            self._canvas_pyramid = TilePyramid.for_tiles(tiles, PYRAMID_CACHE, memory=self._tile_memory)
+        elif canvas_path.exists():
+            # Old projects: one full-size PNG, and its size wins over the manifest's
+            self._canvas_pyramid = TilePyramid.for_image(canvas_path, PYRAMID_CACHE, memory=self._tile_memory)
+            if self._canvas_pyramid is not None:
+                self._canvas_w = self._canvas_pyramid.width
+                self._canvas_h = self._canvas_pyramid.height
 
         self._hex_cache = None
-        self._hex_cache_size = None
+        self._hex_cache_dpr = None
+        # layer id -> widget-space rect it was last laid out at, so a change can repaint just old | new
+        self._layer_rects: dict = {}
+        # Canvas-space bounds of every layer; paint culls with it and clicks hit-test with it
+        self._grid = LayerGrid.from_stack(layers, self._canvas_w, self._canvas_h)
+        self._selected = None
 
     def _update_transform(self):
         padding = 20
@@ -129,52 +186,159 @@ class CanvasView(QWidget):
         scaled_h = self._canvas_h * self._scale
         self._offset_x = (self.width() - scaled_w) / 2
         self._offset_y = (self.height() - scaled_h) / 2
+        self._layer_rects.clear()
+
+    def _layer_rect(self, layer) -> QRectF | None:
+        if layer.id in self._layer_rects:
+            return self._layer_rects[layer.id]
+        rect = None
+        if isinstance(layer, RectLayer):
+            x, y, w, h = layer.bounds(self._canvas_w, self._canvas_h)
+            rect = QRectF(self._offset_x + x * self._scale, self._offset_y + y * self._scale,
+                          w * self._scale, h * self._scale)
+        self._layer_rects[layer.id] = rect
+        return rect
+
+    def invalidate_layer(self, layer_id):
+        # Repaint only where the layer was and where it is now, not the whole frame
+        old = self._layer_rects.pop(layer_id, None)
+        layer = self._layers.get(layer_id)
+        new = self._layer_rect(layer) if layer is not None else None
+        if isinstance(layer, RectLayer):
+            self._grid.insert(layer_id, layer.bounds(self._canvas_w, self._canvas_h))
+        else:
+            self._grid.remove(layer_id)
+        if layer_id in self._video_players and (layer is None or not layer.is_visible):
+            # Nothing to show, so nothing to decode
+            self._video_players.pop(layer_id).stop()
+        if layer is None:
+            self._release_pyramids()
+        self._release_audio()
+        region = QRegion()
+        for rect in (old, new):
+            if rect is not None:
+                # +2px for the antialiased edge and the selection outline
+                region += rect.toAlignedRect().adjusted(-2, -2, 2, 2)
+        if region.isEmpty():
+            return
+        self.update(region)
+
+    def _to_canvas(self, x: float, y: float) -> tuple[float, float]:
+        return (x - self._offset_x) / self._scale, (y - self._offset_y) / self._scale
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton:
+            super().mousePressEvent(event)
+            return
+        pos = event.position()
+        cx, cy = self._to_canvas(pos.x(), pos.y())
+        layer = topmost_layer_at(self._layers, self._grid, cx, cy)
+        self.select_layer(layer.id if layer is not None else None)
+        if isinstance(layer, RectLayer):
+            x, y, _, _ = layer.bounds(self._canvas_w, self._canvas_h)
+            self._drag = (layer.id, cx, cy, x, y)
+
+    def mouseMoveEvent(self, event):
+        if self._drag is None:
+            super().mouseMoveEvent(event)
+            return
+        layer_id, px, py, x, y = self._drag
+        pos = event.position()
+        cx, cy = self._to_canvas(pos.x(), pos.y())
+        self.layer_dragged.emit(layer_id, round(x + cx - px), round(y + cy - py))
+
+    def mouseReleaseEvent(self, event):
+        if self._drag is not None and event.button() == Qt.MouseButton.LeftButton:
+            self._drag = None
+            self.drag_finished.emit()
+        super().mouseReleaseEvent(event)
+
+    @property
+    def selected_layer(self):
+        return self._selected
+
+    @property
+    def assets(self):
+        # The library's asset store the layers' hashes point into
+        return self._assets
+
+    @property
+    def canvas_size(self) -> tuple[int, int]:
+        return self._canvas_w, self._canvas_h
+
+    def select_layer(self, layer_id):
+        if layer_id == self._selected:
+            return
+        old, self._selected = self._selected, layer_id
+        for lid in (old, layer_id):
+            if lid is not None:
+                self.invalidate_layer(lid)
+        self.selection_changed.emit(layer_id)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self._update_transform()
+        if self._video_players:
+            self._video_resize.start()
         self.update()
 
-    def _build_hex_cache(self, w, h):
+    def _build_hex_cache(self, dpr: float):
+        with trace.span("hex_cache", "paint"):
+            self._build_hex_tile(dpr)
+
+    def _build_hex_tile(self, dpr: float):
+        # The pattern repeats every 3 columns and 6 rows (odd-row offset x color cycle), so one tile
+        # of that size rendered once per DPI covers any canvas as a brush. Resizing never redraws a hexagon.
         r = HEX_RADIUS
         hex_w = math.sqrt(3) * r
         hex_h = 2 * r
         row_step = hex_h * 0.75
+        period_w = 3 * hex_w
+        period_h = 6 * row_step
         colors = [QColor(HEX_LIGHT), QColor(HEX_MID), QColor(HEX_DARK)]
 
-        pixmap = QPixmap(int(w), int(h))
+        # A brush tile has to be whole pixels; squeeze the period to fit (under 0.5px across 3 hexes)
+        tile_w = max(1, round(period_w * dpr))
+        tile_h = max(1, round(period_h * dpr))
+
+        pixmap = QPixmap(tile_w, tile_h)
         pixmap.fill(QColor(HEX_DARK))
         painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         painter.setPen(Qt.PenStyle.NoPen)
+        painter.scale(tile_w / period_w, tile_h / period_h)
 
-        rows = int(h / row_step) + 3
-        cols = int(w / hex_w) + 3
-
-        for row in range(-1, rows):
-            for col in range(-1, cols):
+        corners = [
+            (r * math.cos(math.radians(60 * i - 30)), r * math.sin(math.radians(60 * i - 30)))
+            for i in range(6)
+        ]
+        # One ring of neighbours on every side so hexagons cut by the tile edge wrap around seamlessly
+        for row in range(-1, 7):
+            for col in range(-1, 4):
                 cx = col * hex_w + (hex_w * 0.5 if row % 2 else 0)
                 cy = row * row_step
                 ci = ((row % 3) + col) % 3
                 painter.setBrush(colors[ci])
-                points = []
-                for i in range(6):
-                    angle_rad = math.radians(60 * i - 30)
-                    points.append(QPointF(
-                        cx + r * math.cos(angle_rad),
-                        cy + r * math.sin(angle_rad),
-                    ))
-                painter.drawPolygon(QPolygonF(points))
+                painter.drawPolygon(QPolygonF([QPointF(cx + dx, cy + dy) for dx, dy in corners]))
 
         painter.end()
-        self._hex_cache = pixmap
-        self._hex_cache_size = (int(w), int(h))
+        pixmap.setDevicePixelRatio(dpr)
+        self._hex_cache = QBrush(pixmap)
+        self._hex_cache_dpr = dpr
+
+    def _color(self, name: str) -> QColor:
+        color = self._colors.get(name)
+        if color is None:
+            color = self._colors[name] = QColor(name)
+        return color
 
     def paintEvent(self, event):
+        started = time.perf_counter()
+        region = event.region()
+        dirty = region.boundingRect()
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        painter.fillRect(self.rect(), QColor("#1e1e1e"))
+        painter.setClipRegion(region)
 
         canvas_rect = QRectF(
             self._offset_x, self._offset_y,
@@ -182,47 +346,260 @@ class CanvasView(QWidget):
             self._canvas_h * self._scale,
         )
 
-        cw = int(canvas_rect.width())
-        ch = int(canvas_rect.height())
-        if cw > 0 and ch > 0:
-            if self._hex_cache is None or self._hex_cache_size != (cw, ch):
-                self._build_hex_cache(cw, ch)
-            painter.drawPixmap(canvas_rect.toAlignedRect(), self._hex_cache)
+        with trace.span("paint.backdrop", "paint"):
+            painter.fillRect(dirty, QColor("#1e1e1e"))
+            if canvas_rect.width() >= 1 and canvas_rect.height() >= 1:
+                dpr = self.devicePixelRatioF()
+                if self._hex_cache is None or self._hex_cache_dpr != dpr:
+                    self._build_hex_cache(dpr)
+                backdrop = canvas_rect.toAlignedRect()
+                painter.setBrushOrigin(backdrop.topLeft())
+                painter.fillRect(backdrop & dirty, self._hex_cache)
 
-        if self._canvas_pixmap:
-            painter.drawPixmap(canvas_rect.toAlignedRect(), self._canvas_pixmap)
+        if self._canvas_pyramid is not None:
+            with trace.span("paint.canvas", "paint"):
+                self._paint_pyramid(painter, self._canvas_pyramid, canvas_rect, dirty)
 
-        for layer in self._layers:
-            if layer.get("id", 0) == 0:
+        with trace.span("paint.layers", "paint"):
+            # Only the layers the grid says touch the dirty area, drawn bottom to top
+            x0, y0 = self._to_canvas(dirty.left(), dirty.top())
+            x1, y1 = self._to_canvas(dirty.right() + 1, dirty.bottom() + 1)
+            hits = self._grid.query(x0, y0, x1 - x0, y1 - y0)
+            for layer_id in sorted(hits, key=self._layers.z_index):
+                layer = self._layers.get(layer_id)
+                if not layer.is_visible:
+                    continue
+                rect = self._layer_rect(layer)
+                if not region.intersects(rect.toAlignedRect()):
+                    continue
+                if isinstance(layer, SolidColorLayer):
+                    painter.fillRect(rect, self._color(layer.fill))
+                elif isinstance(layer, ImageLayer):
+                    pyramid = self._image_pyramid(layer.asset)
+                    if pyramid is not None:
+                        self._paint_pyramid(painter, pyramid, rect, dirty)
+                elif isinstance(layer, VideoLayer):
+                    self._paint_video(painter, layer, rect)
+                elif isinstance(layer, AudioReactiveLayer):
+                    self._paint_audio(painter, layer, rect)
+
+            selected = self._layers.get(self._selected) if self._selected is not None else None
+            if selected is not None and selected.is_visible:
+                rect = self._layer_rect(selected)
+                if rect is not None:
+                    painter.setPen(QPen(QColor(AEYIAN_BLUE), 2))
+                    painter.setBrush(Qt.BrushStyle.NoBrush)
+                    painter.drawRect(rect)
+
+        if trace.enabled:
+            self._paint_frame_overlay(painter, region, started)
+        painter.end()
+
+    def _image_pyramid(self, digest: str | None) -> TilePyramid | None:
+        if digest not in self._image_pyramids:
+            pyramid = None
+            if digest and self._assets.has(digest):
+                pyramid = TilePyramid.for_image(self._assets.object_path(digest), PYRAMID_CACHE,
+                                                load=lambda: self._assets.image(digest), memory=self._tile_memory)
+            self._image_pyramids[digest] = pyramid
+        return self._image_pyramids[digest]
+
+    def _video_player(self, layer: VideoLayer) -> VideoPlayer | None:
+        player = self._video_players.get(layer.id)
+        if player is None:
+            if layer.asset and self._assets.has(layer.asset):
+                player = VideoPlayer(video=self._assets.object_path(layer.asset), fps=layer.fps, parent=self)
+            elif layer.frames:
+                frames = [self._assets.object_path(d) for d in layer.frames if self._assets.has(d)]
+                player = VideoPlayer(frames=frames, fps=layer.fps, parent=self)
+            else:
+                return None
+            layer_id = layer.id
+            player.frame_ready.connect(lambda: self._update_layer_area(layer_id))
+            player.unavailable.connect(self._on_media_unavailable)
+            self._video_players[layer_id] = player
+        return player
+
+    def _on_media_unavailable(self, reason: str):
+        if reason not in self._media_reported:
+            self._media_reported.add(reason)
+            self.media_unavailable.emit(reason)
+
+    def _paint_video(self, painter: QPainter, layer: VideoLayer, rect: QRectF):
+        player = self._video_player(layer)
+        if player is None:
+            return
+        # Decoded at the size it's shown at, so drawing a frame is a plain blit. Only the first paint sizes
+        # it: a new size restarts the decode, so resizes go through _resize_videos once they settle.
+        if not player.has_size:
+            dpr = self.devicePixelRatioF()
+            player.set_size(round(rect.width() * dpr), round(rect.height() * dpr))
+        if player.current is not None:
+            painter.drawImage(rect, player.current)
+
+    def _resize_videos(self):
+        dpr = self.devicePixelRatioF()
+        for layer_id, player in self._video_players.items():
+            layer = self._layers.get(layer_id)
+            rect = self._layer_rect(layer) if layer is not None else None
+            if rect is not None:
+                player.set_size(round(rect.width() * dpr), round(rect.height() * dpr))
+
+    def _audio_state(self, source: str | None):
+        state = self._audio.get(source)
+        if state is None:
+            # NumPy and the analysis thread only show up once an audio layer is actually drawn
+            from render import AudioAnalyzer, open_source, BANDS
+            import numpy as np
+            path = self._assets.object_path(source) if source and self._assets.has(source) else None
+            try:
+                analyzer = AudioAnalyzer(open_source(path))
+            except (OSError, ValueError):
+                self._audio[source] = state = [None, None, 0.0, 0]
+                return state
+            analyzer.start()
+            state = self._audio[source] = [analyzer, np.zeros(BANDS, dtype=np.float64), 1e-3, -1]
+            self._audio_timer.start()
+        return state
+
+    def _paint_audio(self, painter: QPainter, layer: AudioReactiveLayer, rect: QRectF):
+        analyzer, bands, peak, _ = self._audio_state(layer.source)
+        if analyzer is None:
+            return
+        color = self._color(layer.fill)
+        _, _, since_beat = analyzer.read(bands)
+        if since_beat < 0.15:
+            # Flash on the beat, fading out over 150ms
+            flash = QColor(color)
+            flash.setAlphaF(0.35 * (1 - since_beat / 0.15))
+            painter.fillRect(rect, flash)
+        bar_w = rect.width() / len(bands)
+        for i, energy in enumerate(bands):
+            h = rect.height() * min(1.0, float(energy) / peak)
+            painter.fillRect(QRectF(rect.x() + i * bar_w + 1, rect.bottom() - h, bar_w - 2, h), color)
+
+    def _release_pyramids(self):
+        # An image no layer shows any more gives its tiles back to the shared budget
+        wanted = {layer.asset for layer in self._layers if isinstance(layer, ImageLayer)}
+        for digest in [d for d in self._image_pyramids if d not in wanted]:
+            pyramid = self._image_pyramids.pop(digest)
+            if pyramid is not None:
+                pyramid.invalidate()
+
+    def _release_audio(self):
+        # Analyzers only run while some visible layer listens to them
+        if not self._audio:
+            return
+        wanted = {layer.source for layer in self._layers
+                  if isinstance(layer, AudioReactiveLayer) and layer.is_visible}
+        for source in [s for s in self._audio if s not in wanted]:
+            analyzer = self._audio.pop(source)[0]
+            if analyzer is not None:
+                analyzer.stop()
+        if not self._audio:
+            self._audio_timer.stop()
+
+    def _on_audio_tick(self):
+        # ~60 Hz: repaint audio layers whose source produced new values, and track each source's peak
+        fresh = set()
+        for source, state in self._audio.items():
+            analyzer = state[0]
+            if analyzer is None or analyzer.generation == state[3]:
                 continue
-            if not layer.get("visible", True):
+            state[3] = analyzer.generation
+            analyzer.read(state[1])
+            state[2] = max(state[2] * 0.995, float(state[1].max()), 1e-3)
+            fresh.add(source)
+        if not fresh:
+            return
+        for layer in self._layers:
+            if isinstance(layer, AudioReactiveLayer) and layer.is_visible and layer.source in fresh:
+                self._update_layer_area(layer.id)
+
+    def _update_layer_area(self, layer_id):
+        rect = self._layer_rects.get(layer_id)
+        if rect is not None:
+            self.update(rect.toAlignedRect().adjusted(-2, -2, 2, 2))
+
+    def stop_media(self):
+        self._video_resize.stop()
+        for player in self._video_players.values():
+            player.stop()
+        self._video_players.clear()
+        self._audio_timer.stop()
+        for analyzer, *_ in self._audio.values():
+            if analyzer is not None:
+                analyzer.stop()
+        self._audio.clear()
+
+    def _paint_pyramid(self, painter: QPainter, pyramid: TilePyramid, target: QRectF, dirty):
+        # Source stretched over target (widget coords). The level nearest the screen's resolution,
+        # and only its tiles under the dirty rect.
+        k = target.width() / pyramid.width
+        ky = target.height() / pyramid.height
+        if k <= 0 or ky <= 0:
+            return
+        level = pyramid.level_for_scale(min(k, ky) * self.devicePixelRatioF())
+        x0 = (dirty.left() - target.x()) / k
+        y0 = (dirty.top() - target.y()) / ky
+        x1 = (dirty.right() + 1 - target.x()) / k
+        y1 = (dirty.bottom() + 1 - target.y()) / ky
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        for tx, ty, (x, y, w, h) in pyramid.tiles_in(level, x0, y0, x1 - x0, y1 - y0):
+            img = pyramid.tile(level, tx, ty)
+            if img is None:
                 continue
-            layer_type = layer.get("type", "")
-            if layer_type == "solid_color":
-                pos = layer.get("position", {"x": 0, "y": 0})
-                size = layer.get("size", {"width": self._canvas_w, "height": self._canvas_h})
-                lx = self._offset_x + pos["x"] * self._scale
-                ly = self._offset_y + pos["y"] * self._scale
-                lw = size["width"] * self._scale
-                lh = size["height"] * self._scale
-                painter.fillRect(QRectF(lx, ly, lw, lh), QColor(layer.get("color", "#ffffff")))
+            painter.drawImage(QRectF(target.x() + x * k, target.y() + y * ky, w * k, h * ky), img)
 
-        painter.end()
+    def _paint_frame_overlay(self, painter: QPainter, region: QRegion, started: float):
+        overlay = QRect(8, 8, 230, 20)
+        if region.boundingRect() != overlay:
+            # A repaint of just the overlay isn't a frame worth counting
+            ended = time.perf_counter()
+            trace.record("paint", "paint", started, ended)
+            trace.frame((ended - started) * 1000)
+            if not region.contains(overlay):
+                # Partial repaints miss the corner; queue it so the numbers stay current
+                self.update(overlay)
+        stats = trace.frame_stats()
+        if stats is None:
+            return
+        last, avg, worst = stats
+        painter.fillRect(overlay, QColor(0, 0, 0, 170))
+        painter.setPen(QColor("#e1e1e1"))
+        painter.drawText(overlay.adjusted(6, 0, -6, 0), Qt.AlignmentFlag.AlignVCenter,
+                         f"paint {last:5.1f} ms  avg {avg:5.1f}  max {worst:5.1f}")
 
 
 class CreatorWindow(QMainWindow):
+    # Windows opened by Save As; nobody else holds on to them
+    _successors: set = set()
 
-    def __init__(self, project_path: Path):
+    def __init__(self, project_path: Path, on_close=None, on_preview=None):
         super().__init__()
         self._project_path = project_path
+        self._clone_job = None
+        self._paste_job = None
+        self._export_job = None
+        # Set once Save As has moved editing over to the copy
+        self._handed_off = False
+        # Set when AWE hosts us in its own process; otherwise we hand back to a fresh AWE
+        self._on_close = on_close
+        if on_close is not None:
+            self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        # on_preview(project path) after preview.png is rewritten, so a hosting AWE can refresh the card
+        self._on_preview = on_preview
 
-        try:
-            data = json.loads((project_path / "project.json").read_text())
-            self._project_name = data.get("name", project_path.name)
-            self._layers = data.get("layers", [])
-        except (json.JSONDecodeError, OSError):
-            self._project_name = project_path.name
-            self._layers = []
+        # Holds the manifest in memory; edits get written out in the background
+        self._store = ProjectStore(project_path, self)
+        self._store.save_failed.connect(self._on_save_failed)
+        self._project_name = self._store.data.get("name", project_path.name)
+        self._layers = self._store.layers
+        # All layer edits go through the history so they can be undone
+        self._history = History(self._store, parent=self)
+        self._preview = PreviewRegenerator(self._store, self)
+        if on_preview is not None:
+            self._preview.regenerated.connect(lambda: on_preview(project_path))
 
         self.setWindowTitle(f"AWC - {self._project_name}")
         self.resize(1400, 900)
@@ -263,8 +640,14 @@ class CreatorWindow(QMainWindow):
         project_btn = QPushButton("Project")
         project_btn.setStyleSheet(menu_btn_style)
         project_menu = QMenu(project_btn)
-        project_menu.addAction("Save")
-        project_menu.addAction("Save As")
+        project_menu.addAction("Save", self._store.flush)
+        project_menu.addAction("Save As...", self._on_save_as)
+        # Stores the manifest as a compact bundle (format_version 2) instead of project.json; lossless both ways
+        bundle_action = project_menu.addAction("Compact Project File")
+        bundle_action.setCheckable(True)
+        bundle_action.setChecked(self._store.is_bundle)
+        bundle_action.toggled.connect(self._on_bundle_toggled)
+        project_menu.addAction("Export for Runtime...", self._on_export)
         project_menu.addSeparator()
         project_menu.addAction("Configure")
         project_btn.setMenu(project_menu)
@@ -273,12 +656,22 @@ class CreatorWindow(QMainWindow):
         edit_btn = QPushButton("Edit")
         edit_btn.setStyleSheet(menu_btn_style)
         edit_menu = QMenu(edit_btn)
-        edit_menu.addAction("Undo")
-        edit_menu.addAction("Redo")
+        self._undo_action = edit_menu.addAction("Undo", self._undo)
+        self._undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self._redo_action = edit_menu.addAction("Redo", self._redo)
+        self._redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        # Shortcuts only fire for actions on a visible widget; the menu isn't one until it's opened
+        self.addAction(self._undo_action)
+        self.addAction(self._redo_action)
+        self._history.changed.connect(self._update_history_actions)
+        self._update_history_actions()
         edit_menu.addSeparator()
-        edit_menu.addAction("Cut")
-        edit_menu.addAction("Copy")
-        edit_menu.addAction("Paste")
+        for name, slot, key in (("Cut", self._cut, QKeySequence.StandardKey.Cut),
+                                ("Copy", self._copy, QKeySequence.StandardKey.Copy),
+                                ("Paste", self._paste, QKeySequence.StandardKey.Paste)):
+            action = edit_menu.addAction(name, slot)
+            action.setShortcut(key)
+            self.addAction(action)
         edit_btn.setMenu(edit_menu)
         top_layout.addWidget(edit_btn)
 
@@ -305,24 +698,11 @@ class CreatorWindow(QMainWindow):
         layers_header.setStyleSheet(f"font-size: 14px; color: {AEYIAN_BLUE}; background: transparent;")
         layers_layout.addWidget(layers_header)
 
-        for layer in self._layers:
-            if layer.get("id", 0) == 0:
-                continue
-            row_widget = QWidget()
-            row_widget.setStyleSheet("background: transparent;")
-            row_layout = QHBoxLayout(row_widget)
-            row_layout.setContentsMargins(0, 2, 0, 2)
-            row_layout.setSpacing(4)
-            cb = QCheckBox()
-            cb.setChecked(layer.get("visible", True))
-            layer_id = layer["id"]
-            cb.toggled.connect(lambda checked, lid=layer_id: self._on_visibility_toggled(lid, checked))
-            row_layout.addWidget(cb)
-            name_label = QLabel(layer.get("name", f"Layer {layer_id}"))
-            name_label.setStyleSheet("font-size: 12px; color: #e1e1e1; background: transparent;")
-            row_layout.addWidget(name_label)
-            row_layout.addStretch()
-            layers_layout.addWidget(row_widget)
+        # Rows are filled in after the first frame, see _build_layer_rows
+        self._layers_layout = layers_layout
+        self._layer_rows_built = False
+        # layer id -> (row widget, visibility checkbox)
+        self._layer_rows: dict = {}
 
         layers_layout.addStretch()
         add_layer_btn = QPushButton("+")
@@ -350,8 +730,14 @@ class CreatorWindow(QMainWindow):
         layers_layout.addWidget(add_layer_btn)
         splitter.addWidget(layers_panel)
 
-        self._canvas_view = CanvasView(self._project_path, self._layers)
+        self._canvas_view = CanvasView(self._project_path, self._layers, self._store.data.get("resolution"))
         self._canvas_view.setMinimumWidth(300)
+        self._canvas_view.layer_dragged.connect(self._on_layer_dragged)
+        self._canvas_view.drag_finished.connect(self._history.seal)
+        # Queued: it's raised from inside a paint, which is no place for a dialog
+        self._canvas_view.media_unavailable.connect(
+            lambda reason: QMessageBox.warning(self, "Can't Play Video", reason),
+            Qt.ConnectionType.QueuedConnection)
         splitter.addWidget(self._canvas_view)
 
         inspector_panel = QFrame()
@@ -371,31 +757,376 @@ class CreatorWindow(QMainWindow):
         splitter.setCollapsible(2, False)
         root.addWidget(splitter, 1)
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._layer_rows_built:
+            self._layer_rows_built = True
+            startup.mark("first_paint")
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        with startup.span("layer_rows"):
+            self._build_layer_rows()
+        if startup.enabled:
+            startup.finish()
+            QApplication.quit()
+
+    def _build_layer_rows(self):
+        row = 1  # under the header
+        for layer in self._layers:
+            if layer.is_canvas:
+                continue
+            self._add_layer_row(layer, row)
+            row += 1
+
+    def _add_layer_row(self, layer, row: int):
+        row_widget = QWidget()
+        row_widget.setStyleSheet("background: transparent;")
+        row_layout = QHBoxLayout(row_widget)
+        row_layout.setContentsMargins(0, 2, 0, 2)
+        row_layout.setSpacing(4)
+        cb = QCheckBox()
+        cb.setChecked(layer.is_visible)
+        layer_id = layer.id
+        cb.toggled.connect(lambda checked, lid=layer_id: self._on_visibility_toggled(lid, checked))
+        row_layout.addWidget(cb)
+        name_label = QLabel(layer.display_name)
+        name_label.setStyleSheet("font-size: 12px; color: #e1e1e1; background: transparent;")
+        row_layout.addWidget(name_label)
+        row_layout.addStretch()
+        self._layers_layout.insertWidget(row, row_widget)
+        self._layer_rows[layer_id] = (row_widget, cb)
+
+    def _rebuild_layer_rows(self):
+        for row_widget, _ in self._layer_rows.values():
+            self._layers_layout.removeWidget(row_widget)
+            row_widget.deleteLater()
+        self._layer_rows.clear()
+        self._build_layer_rows()
+
     def _on_add_layer(self):
         dialog = AddLayerDialog(self)
-        dialog.exec()
+        if dialog.exec() != AddLayerDialog.DialogCode.Accepted:
+            return
+        if dialog.selected_type == "Image Layer":
+            self._add_image_layer()
+        elif dialog.selected_type == "Video Layer":
+            self._add_video_layer()
+        elif dialog.selected_type == "Audio Reactive Layer":
+            self._add_audio_layer()
+
+    def _add_image_layer(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Image", "", "Images (*.png *.jpg *.jpeg *.webp *.bmp)")
+        if not path:
+            return
+        assets = self._canvas_view.assets
+        try:
+            digest = assets.import_file(Path(path))
+        except OSError as e:
+            QMessageBox.warning(self, "Import Failed", f"Couldn't import {Path(path).name}:\n{e}")
+            return
+        img = assets.image(digest)
+        if img is None:
+            QMessageBox.warning(self, "Import Failed", f"{Path(path).name} isn't an image AWC can read.")
+            return
+        self._insert_layer(ImageLayer.from_dict({
+            "id": self._layers.next_id(),
+            "name": Path(path).stem,
+            "type": ImageLayer.TYPE,
+            "asset": digest,
+            "visible": True,
+            "position": {"x": 0, "y": 0},
+            "size": {"width": img.width(), "height": img.height()},
+        }))
+
+    def _add_video_layer(self):
+        # One video file, or several images played in name order as a sequence
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "Import Video or Image Sequence", "",
+            "Video or images (*.mp4 *.webm *.mkv *.mov *.png *.jpg *.jpeg *.webp)")
+        if not paths:
+            return
+        paths = sorted(Path(p) for p in paths)
+        assets = self._canvas_view.assets
+        try:
+            digests = [assets.import_file(p) for p in paths]
+        except OSError as e:
+            QMessageBox.warning(self, "Import Failed", f"Couldn't import:\n{e}")
+            return
+        data = {
+            "id": self._layers.next_id(),
+            "name": paths[0].stem,
+            "type": VideoLayer.TYPE,
+            "visible": True,
+        }
+        if len(paths) == 1 and paths[0].suffix.lower() in VIDEO_SUFFIXES:
+            data["asset"] = digests[0]
+        else:
+            data["frames"] = digests
+        # No position/size: it covers the whole canvas
+        self._insert_layer(VideoLayer.from_dict(data))
+
+    def _add_audio_layer(self):
+        box = QMessageBox(QMessageBox.Icon.Question, "Audio Reactive Layer", "React to which audio?",
+                          parent=self)
+        wav_btn = box.addButton("WAV File...", QMessageBox.ButtonRole.AcceptRole)
+        live_btn = box.addButton("Live Input", QMessageBox.ButtonRole.AcceptRole)
+        box.addButton(QMessageBox.StandardButton.Cancel)
+        box.exec()
+        source = None
+        if box.clickedButton() is wav_btn:
+            path, _ = QFileDialog.getOpenFileName(self, "Import Audio", "", "WAV audio (*.wav)")
+            if not path:
+                return
+            from render import check_wav
+            try:
+                check_wav(Path(path))
+                source = self._canvas_view.assets.import_file(Path(path))
+            except (OSError, ValueError) as e:
+                QMessageBox.warning(self, "Import Failed", f"Couldn't import {Path(path).name}:\n{e}")
+                return
+        elif box.clickedButton() is not live_btn:
+            return
+        # Live input is a stand-in tone until there's a PipeWire capture source
+        w, h = self._canvas_view.canvas_size
+        data = {
+            "id": self._layers.next_id(),
+            "name": "Audio",
+            "type": AudioReactiveLayer.TYPE,
+            "visible": True,
+            "position": {"x": 0, "y": h * 3 // 4},
+            "size": {"width": w, "height": h // 4},
+        }
+        if source is not None:
+            data["source"] = source
+        self._insert_layer(AudioReactiveLayer.from_dict(data))
+
+    def _insert_layer(self, layer):
+        self._history.insert(layer)
+        rows = sum(1 for existing in self._layers if not existing.is_canvas)
+        self._add_layer_row(layer, rows)
+        self._canvas_view.invalidate_layer(layer.id)
+        self._on_layers_changed()
 
     def _on_visibility_toggled(self, layer_id: int, visible: bool):
-        toggle_layer_visibility(self._project_path, self._layers, layer_id, visible)
-        self._canvas_view.update()
+        if self._history.set_attrs(layer_id, {"visible": visible}):
+            self._canvas_view.invalidate_layer(layer_id)
+            self._on_layers_changed()
+
+    def _on_layer_dragged(self, layer_id, x: int, y: int):
+        # A whole drag is one undo step: the moves coalesce until the mouse is released
+        if self._history.set_attrs(layer_id, {"x": x, "y": y}, coalesce="move"):
+            self._canvas_view.invalidate_layer(layer_id)
+            self._on_layers_changed()
+
+    def _undo(self):
+        self._after_history(self._history.undo())
+
+    def _redo(self):
+        self._after_history(self._history.redo())
+
+    def _after_history(self, step):
+        if step is None:
+            return
+        layer_ids, structural = step
+        if structural:
+            self._rebuild_layer_rows()
+            if self._canvas_view.selected_layer not in self._layers:
+                self._canvas_view.select_layer(None)
+        for layer_id in layer_ids:
+            layer = self._layers.get(layer_id)
+            row = self._layer_rows.get(layer_id)
+            if not structural and layer is not None and row is not None:
+                cb = row[1]
+                cb.blockSignals(True)
+                cb.setChecked(layer.is_visible)
+                cb.blockSignals(False)
+            self._canvas_view.invalidate_layer(layer_id)
+        self._on_layers_changed()
+
+    def _copy(self) -> bool:
+        layer = self._layers.get(self._canvas_view.selected_layer)
+        if layer is None or layer.is_canvas:
+            return False
+        QApplication.clipboard().setMimeData(layers_to_mime([layer], self._canvas_view.assets.root))
+        return True
+
+    def _cut(self):
+        layer_id = self._canvas_view.selected_layer
+        if not self._copy():
+            return
+        self._canvas_view.select_layer(None)
+        self._history.remove(layer_id)
+        self._rebuild_layer_rows()
+        self._canvas_view.invalidate_layer(layer_id)
+        self._on_layers_changed()
+
+    def _paste(self):
+        # Descriptors only: pasted layers point at the same assets, nothing gets copied or decoded again
+        if self._paste_job is not None:
+            return
+        assets = self._canvas_view.assets
+        source_root, layers = layer_dicts_from_mime(QApplication.clipboard().mimeData())
+        if not layers:
+            return
+        missing = missing_assets(layers, source_root, assets)
+        if not missing:
+            self._insert_pasted(layers_from_dicts(layers, self._layers))
+            return
+        # From another library: its files get copied in off the UI thread, the layers follow once they're here
+        job = PasteJob(assets, source_root, layers, missing, self)
+        job.finished.connect(self._on_paste_imported)
+        self._paste_job = job
+        QApplication.setOverrideCursor(Qt.CursorShape.BusyCursor)
+        job.start()
+
+    def _on_paste_imported(self, layers: list, bad: set):
+        if self._paste_job is None:
+            # The window closed while it ran
+            return
+        self._paste_job = None
+        QApplication.restoreOverrideCursor()
+        self._insert_pasted(layers_from_dicts(layers, self._layers, bad))
+
+    def _insert_pasted(self, pasted: list):
+        if not pasted:
+            return
+        self._history.insert_many(pasted)
+        self._rebuild_layer_rows()
+        for layer in pasted:
+            self._canvas_view.invalidate_layer(layer.id)
+        self._canvas_view.select_layer(pasted[-1].id)
+        self._on_layers_changed()
+
+    def _update_history_actions(self):
+        self._undo_action.setEnabled(self._history.can_undo)
+        self._redo_action.setEnabled(self._history.can_redo)
+
+    def _on_layers_changed(self):
+        self._preview.schedule()
+
+    def _on_save_as(self):
+        if self._clone_job is not None:
+            return
+        name, ok = QInputDialog.getText(self, "Save As", "Name of the copy:", text=f"{self._project_name} (Copy)")
+        if not ok or not name.strip():
+            return
+        # The copy is made from disk, so the latest edits have to be there first
+        if not self._store.flush():
+            return
+        # Reflinks where the filesystem has them, otherwise a chunked copy; either way off the UI thread
+        job = CloneJob(self._project_path, new_project_dir(self._project_path.parent), name.strip(), self)
+        progress = QProgressDialog(f"Saving '{name.strip()}'...", "Cancel", 0, 1000, self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(job.cancel)
+        job.progress.connect(lambda done, total: progress.setValue(int(1000 * done / total) if total else 0))
+        job.finished.connect(lambda path, stats: self._on_saved_as(path, progress))
+        job.failed.connect(lambda error: self._on_save_as_failed(error, progress))
+        self._clone_job = job
+        job.start()
+
+    def _on_saved_as(self, path: Path, progress: QProgressDialog):
+        self._clone_job = None
+        progress.close()
+        # Keep editing in the copy; whoever was waiting for this window to close waits for that one instead
+        window = CreatorWindow(path, on_close=self._on_close, on_preview=self._on_preview)
+        window.setStyleSheet(self.styleSheet())
+        CreatorWindow._successors.add(window)
+        window.setGeometry(self.geometry())
+        window.show()
+        self._handed_off = True
+        self.close()
+
+    def _on_save_as_failed(self, error: str, progress: QProgressDialog):
+        self._clone_job = None
+        progress.close()
+        if error:
+            QMessageBox.warning(self, "Save As", f"Couldn't save a copy of {self._project_name}:\n{error}")
+
+    def _on_export(self):
+        if self._export_job is not None:
+            return
+        out = QFileDialog.getExistingDirectory(self, "Export for Runtime")
+        if not out:
+            return
+        # The export reads the project from disk, so get the latest edits there first
+        if not self._store.flush():
+            return
+        # Decoding, scaling and PNG encoding every texture takes a while; off the UI thread like Save As
+        job = ExportJob(self._project_path, Path(out), self)
+        progress = QProgressDialog(f"Exporting {self._project_name}...", "", 0, 0, self)
+        # export_project has no way to stop halfway, so no Cancel
+        progress.setCancelButton(None)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+        job.finished.connect(lambda layout, skipped: self._on_exported(layout, skipped, progress))
+        job.failed.connect(lambda error: self._on_export_failed(error, progress))
+        self._export_job = job
+        job.start()
+
+    def _on_exported(self, layout: dict, skipped: list, progress: QProgressDialog):
+        self._export_job = None
+        progress.close()
+        text = f"Exported {len(layout['layers'])} layers in {len(layout['textures'])} textures."
+        if skipped:
+            text += "\n\nNot supported by the runtime yet, left out:\n" + "\n".join(skipped)
+        QMessageBox.information(self, "Export for Runtime", text)
+
+    def _on_export_failed(self, error: str, progress: QProgressDialog):
+        self._export_job = None
+        progress.close()
+        QMessageBox.warning(self, "Export Failed", f"Couldn't export {self._project_name}:\n{error}")
+
+    def _on_bundle_toggled(self, enabled: bool):
+        self._store.set_bundle(enabled)
+
+    def _on_save_failed(self, error: str):
+        QMessageBox.warning(self, "Save Failed", f"Couldn't save {self._project_name}:\n{error}")
 
     def closeEvent(self, event):
-        subprocess.Popen([sys.executable, str(AWE_PATH)])
+        if self._paste_job is not None:
+            self._paste_job.cancel()
+            self._paste_job = None
+            QApplication.restoreOverrideCursor()
+        self._canvas_view.stop_media()
+        self._store.close()
+        self._preview.flush()
+        CreatorWindow._successors.discard(self)
+        if not self._handed_off:
+            if self._on_close is not None:
+                self._on_close()
+            else:
+                subprocess.Popen([sys.executable, str(AWE_PATH), "--subprocess"])
         event.accept()
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: AWC.py <project_path>")
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print("Usage: AWC.py <project_path> [--profile-startup[=out.json]] [--trace[=out.json]]")
         sys.exit(1)
 
-    project_path = Path(sys.argv[1])
-    if not (project_path / "project.json").exists():
-        print(f"No project.json found in {project_path}")
+    project_path = Path(args[0])
+    if not manifest_path(project_path).exists():
+        print(f"No project.json or {BUNDLE_NAME} found in {project_path}")
         sys.exit(1)
 
+    # --profile-startup[=out.json]: time the cold start up to a populated editor, print it and quit
+    profile, profile_out = parse_profile_flag(sys.argv)
+    if profile:
+        startup.enable(_T_START, profile_out)
+        startup.mark("imports", _T_IMPORTED)
+    # --trace[=out.json]: record paint/save timings, show frame times on the canvas, dump a Chrome trace on exit
+    tracing, trace_out = parse_trace_flag(sys.argv)
+    if tracing:
+        trace.enable(trace_out)
     app = QApplication(sys.argv)
+    startup.mark("qapplication")
     app.setStyleSheet(DARK_STYLE)
     window = CreatorWindow(project_path)
+    startup.mark("window_built")
     window.show()
-    sys.exit(app.exec())
+    code = app.exec()
+    trace.finish()
+    sys.exit(code)
@@ -1,22 +1,32 @@
 #!/usr/bin/env python3
+import time
+_T_START = time.perf_counter()
+
 import json
-import random
 import shutil
-import string
 import subprocess
 import sys
-from datetime import datetime
+import threading
 from pathlib import Path
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget,
     QLabel, QVBoxLayout, QHBoxLayout, QFrame, QPushButton,
-    QScrollArea, QGridLayout, QDialog, QLineEdit, QSpinBox,
+    QListView, QDialog, QLineEdit, QSpinBox,
     QDialogButtonBox, QSizePolicy, QMessageBox, QInputDialog,
-    QComboBox, QFormLayout,
+    QComboBox, QFormLayout, QAbstractItemView, QProgressDialog,
+)
+from PySide6.QtGui import QImage, QColor, QDesktopServices
+from PySide6.QtCore import Qt, QUrl, QTimer
+
+from project import (
+    ProjectIndex, ProjectWatcher, read_summary, read_manifest, write_manifest, create_canvas, TILE_SIZE,
+    CloneJob, new_project_dir, sweep_library,
 )
-from PySide6.QtGui import QPixmap, QImage, QColor, QDesktopServices
-from PySide6.QtCore import Qt, QUrl
+from gallery import ProjectListModel, ProjectCardDelegate, ThumbnailService
+from timing import startup, parse_profile_flag, trace, parse_trace_flag
+
+_T_IMPORTED = time.perf_counter()
 
 
 _HOME = Path.home()
@@ -24,6 +34,12 @@ _WHICH = shutil.which
 
 PROJECTS_DIR = _HOME / ".local" / "share" / "interactive-wallpapers"
 CONFIG_PATH = _HOME / ".config" / "AWE.json" #TODO: actually use it.
+CACHE_DIR = _HOME / ".cache" / "AWE"
+INDEX_PATH = CACHE_DIR / "index.json"
+THUMBS_DIR = CACHE_DIR / "thumbs"
+# The editor's image pyramids (AWC.PYRAMID_CACHE); a swept asset's pyramid goes with it
+PYRAMID_DIR = CACHE_DIR / "pyramid"
+THUMBS_MEMORY_BUDGET = 32 * 1024 * 1024
 
 AWE_VERSION = "0.0.3" #TODO: actually pull from the fucking project.
 AEYIAN_BLUE = "#3A41E1"
@@ -62,6 +78,11 @@ DARK_STYLE = f"""
 """
 
 
+def _sweep_library():
+    from render import TilePyramid
+    sweep_library(PROJECTS_DIR, on_remove=lambda path: TilePyramid.forget(path, PYRAMID_DIR))
+
+
 def find_qdbus():
     # Plasma 6: qdbus6 (qt6-tools)
     # Plasma 5: qdbus or qdbus-qt5 (qt5-tools)
@@ -71,25 +92,12 @@ def find_qdbus():
     raise FileNotFoundError("No qdbus found. Install 'qt6-tools' or 'qt5-tools'.") # I hate backwards comp.
 
 
-def generate_project_id() -> str:
-    # ID is better than name eh?
-    timestamp = datetime.now().strftime("%d%m%y%H%M%S")
-    suffix = ''.join(random.choice(string.ascii_uppercase) for _ in range(3))
-    return f"{timestamp}-{suffix}"
-
-
 def generate_red_preview(path: Path):
     img = QImage(CARD_W, CARD_H, QImage.Format.Format_RGB32)
     img.fill(QColor(PLACEHOLDER_RED))
     img.save(str(path))
 
 
-def generate_canvas(path: Path, width: int, height: int):
-    img = QImage(width, height, QImage.Format.Format_ARGB32)
-    img.fill(Qt.GlobalColor.transparent)
-    img.save(str(path))
-
-
 class NewProjectDialog(QDialog):
 
     def __init__(self, parent=None):
@@ -177,44 +185,79 @@ class SettingsDialog(QDialog):
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, single_process: bool = True):
         super().__init__()
         self.setWindowTitle("AWE - Aeyian Wallpaper Engine")
         self.resize(1200, 800)
 
         self._selected_project = None
+        self._single_process = single_process
+        self._editor = None
+        self._clone_job = None
+        self._sweep = None
+        self._settings_dialog = None
+        self._sidebar_details = None
+        self._started = False
 
         PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
+        self._index = ProjectIndex(PROJECTS_DIR, INDEX_PATH)
+        self._thumbs = ThumbnailService(THUMBS_DIR, THUMBS_MEMORY_BUDGET, self)
+        self._thumbs.ready.connect(self._on_thumb_ready)
 
         self._main_screen = self._build_main_screen()
         self.setCentralWidget(self._main_screen)
 
-    def showEvent(self, event):
-        super().showEvent(event)
-        self._refresh_grid()
+        # After the first scan the watcher keeps the grid current; no more full rescans
+        self._watcher = ProjectWatcher(self._index, PROJECTS_DIR, self)
+        self._watcher.added.connect(self._on_project_added)
+        self._watcher.updated.connect(self._on_project_updated)
+        self._watcher.removed.connect(self._on_project_removed)
+        self._watcher.touched.connect(self._on_project_touched)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._started:
+            # Get a frame on screen first, the library can fill in right after
+            self._started = True
+            startup.mark("first_paint")
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        with startup.span("scan"):
+            self._refresh_grid()
+        self._watcher.start()
+        startup.mark("grid_filled")
+        if startup.enabled:
+            startup.finish()
+            QApplication.quit()
+            return
+        self._sweep_assets()
+
+    def _on_project_added(self, project: dict):
+        self._grid_model.add_project(project)
+        self._update_grid_hint()
+
+    def _on_project_updated(self, project: dict):
+        self._grid_model.update_project(project)
+        if project["path"] == self._selected_project:
+            self._select_project(project["path"])
+
+    def _on_project_removed(self, path: Path):
+        self._grid_model.remove_project(path)
+        self._update_grid_hint()
+        if path == self._selected_project:
+            self._selected_project = None
+            self._clear_sidebar()
 
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        self._refresh_grid()
+    def _on_project_touched(self, path: Path):
+        self._thumbs.invalidate(path / "preview.png")
+        self._grid_model.refresh_preview(path)
+        if path == self._selected_project:
+            self._show_sidebar_preview(path)
 
 
     def _scan_projects(self) -> list[dict]:
-        projects = []
-        if not PROJECTS_DIR.exists():
-            return projects
-        for d in sorted(PROJECTS_DIR.iterdir()):
-            manifest = d / "project.json"
-            if d.is_dir() and manifest.exists():
-                try:
-                    data = json.loads(manifest.read_text())
-                    projects.append({
-                        "name": data.get("name", d.name),
-                        "id": data.get("id", d.name),
-                        "path": d,
-                    })
-                except (json.JSONDecodeError, OSError):
-                    continue
-        return projects
+        return self._index.scan()
 
 
     def _on_new_project(self):
@@ -223,19 +266,15 @@ class MainWindow(QMainWindow):
             return
 
         values = dialog.get_values()
-        project_id = generate_project_id()
-        project_dir = PROJECTS_DIR / project_id
-
-        # Extremely unlikely but handle ID collision
-        while project_dir.exists():
-            project_id = generate_project_id()
-            project_dir = PROJECTS_DIR / project_id
+        project_dir = new_project_dir(PROJECTS_DIR)
+        project_id = project_dir.name
 
         project_dir.mkdir(parents=True)
         (project_dir / "assets").mkdir()
 
         generate_red_preview(project_dir / "preview.png")
-        generate_canvas(project_dir / "canvas.png", values["width"], values["height"])
+        # Blank canvas = empty tile folder, however big the resolution
+        canvas_source = create_canvas(project_dir)
 
         manifest = {
             "id": project_id,
@@ -251,7 +290,8 @@ class MainWindow(QMainWindow):
                     "id": 0,
                     "name": "Canvas",
                     "type": "canvas",
-                    "source": "canvas.png",
+                    "source": canvas_source,
+                    "tile_size": TILE_SIZE,
                 },
                 {
                     "id": 1,
@@ -268,29 +308,41 @@ class MainWindow(QMainWindow):
             ],
             "properties": {},
         }
-        (project_dir / "project.json").write_text(
-            json.dumps(manifest, indent=2)
-        )
+        write_manifest(project_dir, manifest)
 
-        self._refresh_grid()
+        self._watcher.refresh(project_dir)
         self._select_project(project_dir)
 
 
     def _on_edit_project(self):
         if not self._selected_project:
             return
-        awc_path = Path(__file__).parent / "AWC.py"
-        subprocess.Popen([sys.executable, str(awc_path), str(self._selected_project)])
-        QApplication.quit()
+        if not self._single_process:
+            awc_path = Path(__file__).parent / "AWC.py"
+            subprocess.Popen([sys.executable, str(awc_path), str(self._selected_project)])
+            QApplication.quit()
+            return
+
+        # Same process, so the index, thumbnails and Qt itself stay warm for the way back
+        from AWC import CreatorWindow, DARK_STYLE as AWC_STYLE
+        # The watcher would get there too, but only after its debounce and an index refresh
+        self._editor = CreatorWindow(self._selected_project, on_close=self._on_editor_closed,
+                                     on_preview=self._on_project_touched)
+        self._editor.setStyleSheet(AWC_STYLE)
+        self._editor.show()
+        self.hide()
+
+    def _on_editor_closed(self):
+        self._editor = None
+        self.show()
 
     def _on_rename_project(self):
         if not self._selected_project:
             return
 
-        manifest_path = self._selected_project / "project.json"
         try:
-            data = json.loads(manifest_path.read_text())
-        except (json.JSONDecodeError, OSError):
+            data = read_manifest(self._selected_project)
+        except (json.JSONDecodeError, OSError, ValueError):
             return
 
         current_name = data.get("name", "")
@@ -301,21 +353,50 @@ class MainWindow(QMainWindow):
             return
 
         data["name"] = new_name.strip()
-        manifest_path.write_text(json.dumps(data, indent=2))
+        try:
+            write_manifest(self._selected_project, data)
+        except OSError as e:
+            QMessageBox.warning(self, "Rename Project", f"Couldn't save the new name:\n{e}")
+            return
 
-        self._refresh_grid()
-        self._select_project(self._selected_project)
+        self._watcher.refresh(self._selected_project)
 
 
+    def _on_duplicate_project(self):
+        if not self._selected_project or self._clone_job is not None:
+            return
+        summary = read_summary(self._selected_project)
+        name = summary["name"] if summary else self._selected_project.name
+        # Reflinks where the filesystem has them, otherwise a chunked copy; either way off the UI thread
+        job = CloneJob(self._selected_project, new_project_dir(PROJECTS_DIR), f"{name} (Copy)", self)
+        progress = QProgressDialog(f"Duplicating '{name}'...", "Cancel", 0, 1000, self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(job.cancel)
+        job.progress.connect(lambda done, total: progress.setValue(int(1000 * done / total) if total else 0))
+        job.finished.connect(lambda path, stats: self._on_duplicated(path, progress))
+        job.failed.connect(lambda error: self._on_duplicate_failed(error, progress))
+        self._clone_job = job
+        job.start()
+
+    def _on_duplicated(self, path: Path, progress: QProgressDialog):
+        self._clone_job = None
+        progress.close()
+        self._watcher.refresh(path)
+        self._select_project(path)
+
+    def _on_duplicate_failed(self, error: str, progress: QProgressDialog):
+        self._clone_job = None
+        progress.close()
+        if error:
+            QMessageBox.warning(self, "Duplicate Project", f"Couldn't duplicate the project:\n{error}")
+
     def _on_delete_project(self):
         if not self._selected_project:
             return
 
-        try:
-            data = json.loads((self._selected_project / "project.json").read_text())
-            name = data.get("name", self._selected_project.name)
-        except (json.JSONDecodeError, OSError):
-            name = self._selected_project.name
+        summary = read_summary(self._selected_project)
+        name = summary["name"] if summary else self._selected_project.name
 
         reply = QMessageBox.question(
             self, "Delete Project",
@@ -327,130 +408,125 @@ class MainWindow(QMainWindow):
             return
 
         shutil.rmtree(self._selected_project)
-        self._selected_project = None
-        self._clear_sidebar()
-        self._refresh_grid()
+        self._watcher.refresh(self._selected_project)
+        self._sweep_assets()
 
 
+    def _sweep_assets(self):
+        # Files no project references any more (deleted projects and layers, cuts never pasted) go away.
+        # Not while an editor is open: its undo history and clipboard can still point at them.
+        if self._editor is not None or (self._sweep is not None and self._sweep.is_alive()):
+            return
+        self._sweep = threading.Thread(target=_sweep_library, name="AssetSweep", daemon=True)
+        self._sweep.start()
+
     def _on_settings(self):
-        dialog = SettingsDialog(self)
-        dialog.exec()
+        if self._settings_dialog is None:
+            self._settings_dialog = SettingsDialog(self)
+        self._settings_dialog.exec()
 
     def _refresh_grid(self):
-        while self._grid_layout.count():
-            item = self._grid_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-
-        projects = self._scan_projects()
-
-        if not projects:
-            hint = QLabel("No wallpapers yet")
-            hint.setStyleSheet(f"font-size: 16px; color: #555; background: transparent;")
-            hint.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self._grid_layout.addWidget(hint, 0, 0)
-            return
-
-        cols = max(1, (self._grid_container.width() - 24) // (CARD_W + 12))
-        for i, project in enumerate(projects):
-            card = self._make_card(project)
-            self._grid_layout.addWidget(card, i // cols, i % cols)
-
-    def _make_card(self, project: dict) -> QFrame:
-        card = QFrame()
-        card.setFixedSize(CARD_W, CARD_H + 24)
-        card.setCursor(Qt.CursorShape.PointingHandCursor)
-        card.setStyleSheet(f"""
-            QFrame {{
-                background-color: #252525;
-                border: 2px solid transparent;
-                border-radius: 4px;
-            }}
-        """)
-
-        layout = QVBoxLayout(card)
-        layout.setContentsMargins(0, 0, 0, 4)
-        layout.setSpacing(2)
-
-        # Red or alive Xtreme — always loads preview.png (generated at creation)
-        preview = QLabel()
-        preview.setFixedSize(CARD_W, CARD_H)
-        preview_path = project["path"] / "preview.png"
-        pixmap = QPixmap(str(preview_path))
-        preview.setPixmap(
-            pixmap.scaled(CARD_W, CARD_H, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                          Qt.TransformationMode.SmoothTransformation)
-        )
-        layout.addWidget(preview)
+        # Full scan, done once at startup. The watcher feeds the model deltas after that.
+        with trace.span("grid.refresh", "launcher"):
+            self._grid_model.set_projects(self._scan_projects())
+        self._update_grid_hint()
+        if self._selected_project:
+            self._sync_grid_selection(self._selected_project)
 
-        name = QLabel(project["name"])
-        name.setStyleSheet("font-size: 11px; color: #e1e1e1; background: transparent; padding-left: 4px;")
-        name.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        layout.addWidget(name)
+    def _update_grid_hint(self):
+        empty = self._grid_model.rowCount() == 0
+        self._grid_hint.setVisible(empty)
+        self._grid_view.setVisible(not empty)
 
-        card.project_path = project["path"]
-        card.mousePressEvent = lambda e, p=project["path"]: self._select_project(p)
+    def _sync_grid_selection(self, path: Path):
+        index = self._grid_model.index_of(path)
+        if index.isValid() and self._grid_view.currentIndex() != index:
+            self._grid_view.setCurrentIndex(index)
 
-        return card
+    def _on_card_changed(self, current, previous):
+        path = self._grid_model.path_at(current)
+        if path is not None and path != self._selected_project:
+            self._select_project(path)
 
 
     def _select_project(self, path: Path):
         self._selected_project = path
 
-        try:
-            data = json.loads((path / "project.json").read_text())
-            self._sidebar_label.setText(data.get("name", path.name))
-            self._sidebar_id_label.setText(f"ID: {data.get('id', path.name)}")
-            self._sidebar_format_ver.setText(f"Format Version: {data.get('format_version', '?')}")
-            self._sidebar_editor_ver.setText(f"Editor Version: {data.get('editor_version', '?')}")
-            res = data.get("resolution", {})
-            self._sidebar_resolution.setText(f"Resolution: {res.get('width', '?')} x {res.get('height', '?')}")
-        except (json.JSONDecodeError, OSError):
+        # The index already holds everything the sidebar shows
+        data = self._index.get(path) or read_summary(path)
+        self._ensure_sidebar_details()
+        if data:
+            self._sidebar_label.setText(data["name"])
+            self._sidebar_id_label.setText(f"ID: {data['id']}")
+            self._sidebar_format_ver.setText(f"Format Version: {data['format_version']}")
+            self._sidebar_editor_ver.setText(f"Editor Version: {data['editor_version']}")
+            res = data["resolution"]
+            self._sidebar_resolution.setText(f"Resolution: {res['width']} x {res['height']}")
+        else:
             self._sidebar_label.setText(path.name)
             self._sidebar_id_label.setText(f"ID: {path.name}")
             self._sidebar_format_ver.setText("")
             self._sidebar_editor_ver.setText("")
             self._sidebar_resolution.setText("")
 
-        preview_path = path / "preview.png"
-        pixmap = QPixmap(str(preview_path))
-        self._sidebar_preview.setPixmap(
-            pixmap.scaled(SIDEBAR_PREVIEW_W, SIDEBAR_PREVIEW_H,
-                          Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-                          Qt.TransformationMode.SmoothTransformation)
-        )
+        self._show_sidebar_preview(path)
+
+        self._sync_grid_selection(path)
+
+
+    def _show_sidebar_preview(self, path: Path):
+        pixmap = self._thumbs.get(path / "preview.png", SIDEBAR_PREVIEW_W, SIDEBAR_PREVIEW_H)
+        if pixmap is None or pixmap.isNull():
+            # Placeholder until the thumbnail service gets back to us
+            self._sidebar_preview.clear()
+        else:
+            self._sidebar_preview.setPixmap(pixmap)
+
+    def _on_thumb_ready(self, source: Path, w: int, h: int):
+        if (w, h) == (SIDEBAR_PREVIEW_W, SIDEBAR_PREVIEW_H) and source.parent == self._selected_project:
+            self._show_sidebar_preview(self._selected_project)
 
+    def _ensure_sidebar_details(self):
+        if self._sidebar_details is not None:
+            return
+        details = QWidget()
+        details.setStyleSheet("background: transparent;")
+        details_layout = QVBoxLayout(details)
+        details_layout.setContentsMargins(0, 0, 0, 0)
 
-        for i in range(self._grid_layout.count()):
-            item = self._grid_layout.itemAt(i)
-            if item and item.widget():
-                w = item.widget()
-                if isinstance(w, QFrame) and hasattr(w, 'project_path'):
-                    if w.project_path == path:
-                        w.setStyleSheet(f"""
-                            QFrame {{
-                                background-color: #252525;
-                                border: 2px solid {AEYIAN_BLUE};
-                                border-radius: 4px;
-                            }}
-                        """)
-                    else:
-                        w.setStyleSheet(f"""
-                            QFrame {{
-                                background-color: #252525;
-                                border: 2px solid transparent;
-                                border-radius: 4px;
-                            }}
-                        """)
+        # Project ID
+        self._sidebar_id_label = QLabel("")
+        self._sidebar_id_label.setStyleSheet(f"font-size: 12px; color: #888; background: transparent;")
+        self._sidebar_id_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        details_layout.addWidget(self._sidebar_id_label)
 
+        # Project info labels
+        info_style = f"font-size: 12px; color: #888; background: transparent;"
+        self._sidebar_format_ver = QLabel("")
+        self._sidebar_format_ver.setStyleSheet(info_style)
+        details_layout.addWidget(self._sidebar_format_ver)
+
+        self._sidebar_editor_ver = QLabel("")
+        self._sidebar_editor_ver.setStyleSheet(info_style)
+        details_layout.addWidget(self._sidebar_editor_ver)
+
+        self._sidebar_resolution = QLabel("")
+        self._sidebar_resolution.setStyleSheet(info_style)
+        details_layout.addWidget(self._sidebar_resolution)
+
+        # Right under the project name
+        self._sidebar_layout.insertWidget(self._sidebar_layout.indexOf(self._sidebar_label) + 1, details)
+        self._sidebar_details = details
 
     def _clear_sidebar(self):
         self._sidebar_label.setText("Properties")
-        self._sidebar_id_label.setText("")
-        self._sidebar_format_ver.setText("")
-        self._sidebar_editor_ver.setText("")
-        self._sidebar_resolution.setText("")
+        if self._sidebar_details is not None:
+            self._sidebar_id_label.setText("")
+            self._sidebar_format_ver.setText("")
+            self._sidebar_editor_ver.setText("")
+            self._sidebar_resolution.setText("")
         self._sidebar_preview.clear()
+        self._grid_view.clearSelection()
         self._sidebar_preview.setStyleSheet(f"background-color: {PLACEHOLDER_RED}; border-radius: 4px;")
 
 
@@ -481,25 +557,8 @@ class MainWindow(QMainWindow):
         self._sidebar_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
         sidebar_layout.addWidget(self._sidebar_label)
 
-        # Project ID
-        self._sidebar_id_label = QLabel("")
-        self._sidebar_id_label.setStyleSheet(f"font-size: 12px; color: #888; background: transparent;")
-        self._sidebar_id_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
-        sidebar_layout.addWidget(self._sidebar_id_label)
-
-        # Project info labels
-        info_style = f"font-size: 12px; color: #888; background: transparent;"
-        self._sidebar_format_ver = QLabel("")
-        self._sidebar_format_ver.setStyleSheet(info_style)
-        sidebar_layout.addWidget(self._sidebar_format_ver)
-
-        self._sidebar_editor_ver = QLabel("")
-        self._sidebar_editor_ver.setStyleSheet(info_style)
-        sidebar_layout.addWidget(self._sidebar_editor_ver)
-
-        self._sidebar_resolution = QLabel("")
-        self._sidebar_resolution.setStyleSheet(info_style)
-        sidebar_layout.addWidget(self._sidebar_resolution)
+        # Details get built on first selection, nothing to show before that
+        self._sidebar_layout = sidebar_layout
 
         sidebar_layout.addStretch()
 
@@ -509,9 +568,10 @@ class MainWindow(QMainWindow):
 
         self._btn_edit = QPushButton("Edit")
         self._btn_rename = QPushButton("Rename")
+        self._btn_duplicate = QPushButton("Duplicate")
         self._btn_delete = QPushButton("Delete")
 
-        for btn in (self._btn_edit, self._btn_rename, self._btn_delete):
+        for btn in (self._btn_edit, self._btn_rename, self._btn_duplicate, self._btn_delete):
             btn.setStyleSheet(f"""
                 QPushButton {{ background: transparent; border: 1px solid {BTN_BORDER}; }}
                 QPushButton:hover {{ background-color: {BTN_HOVER}; }}
@@ -520,6 +580,7 @@ class MainWindow(QMainWindow):
 
         self._btn_edit.clicked.connect(self._on_edit_project)
         self._btn_rename.clicked.connect(self._on_rename_project)
+        self._btn_duplicate.clicked.connect(self._on_duplicate_project)
         self._btn_delete.clicked.connect(self._on_delete_project)
 
         sidebar_layout.addLayout(sidebar_btn_row)
@@ -534,17 +595,30 @@ class MainWindow(QMainWindow):
         content_layout = QVBoxLayout(content)
         content_layout.setContentsMargins(12, 12, 12, 12)
 
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("QScrollArea { border: none; background: transparent; }")
-
-        self._grid_container = QWidget()
-        self._grid_layout = QGridLayout(self._grid_container)
-        self._grid_layout.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-        self._grid_layout.setSpacing(12)
-        scroll.setWidget(self._grid_container)
-
-        content_layout.addWidget(scroll, 1)
+        # Cards are painted by the delegate, only the visible ones
+        self._grid_model = ProjectListModel(self._thumbs, CARD_W, CARD_H, self)
+        self._grid_view = QListView()
+        self._grid_view.setModel(self._grid_model)
+        self._grid_view.setItemDelegate(
+            ProjectCardDelegate(CARD_W, CARD_H, AEYIAN_BLUE, PLACEHOLDER_RED, self._grid_view)
+        )
+        self._grid_view.setViewMode(QListView.ViewMode.IconMode)
+        self._grid_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self._grid_view.setMovement(QListView.Movement.Static)
+        self._grid_view.setUniformItemSizes(True)
+        self._grid_view.setSpacing(6)
+        self._grid_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self._grid_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self._grid_view.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+        self._grid_view.setStyleSheet("QListView { border: none; background: transparent; }")
+        self._grid_view.selectionModel().currentChanged.connect(self._on_card_changed)
+        content_layout.addWidget(self._grid_view, 1)
+
+        self._grid_hint = QLabel("No wallpapers yet")
+        self._grid_hint.setStyleSheet(f"font-size: 16px; color: #555; background: transparent;")
+        self._grid_hint.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._grid_hint.hide()
+        content_layout.addWidget(self._grid_hint, 1)
 
         # Bottom buttons
         content_btn_row = QHBoxLayout()
@@ -561,14 +635,27 @@ class MainWindow(QMainWindow):
         layout.addWidget(sidebar)
         layout.addWidget(separator)
         layout.addWidget(content, 1)
-        self._refresh_grid()
 
         return page
 
 
 if __name__ == "__main__":
+    # --subprocess: old behaviour, AWE and AWC as separate processes handing off to each other
+    # --profile-startup[=out.json]: time the cold start up to a filled grid, print it and quit
+    profile, profile_out = parse_profile_flag(sys.argv)
+    if profile:
+        startup.enable(_T_START, profile_out)
+        startup.mark("imports", _T_IMPORTED)
+    # --trace[=out.json]: record paint/save timings (the editor shows frame times too), dump a Chrome trace on exit
+    tracing, trace_out = parse_trace_flag(sys.argv)
+    if tracing:
+        trace.enable(trace_out)
     app = QApplication(sys.argv)
+    startup.mark("qapplication")
     app.setStyleSheet(DARK_STYLE)
-    window = MainWindow()
+    window = MainWindow(single_process="--subprocess" not in sys.argv)
+    startup.mark("window_built")
     window.show()
-    sys.exit(app.exec())
+    code = app.exec()
+    trace.finish()
+    sys.exit(code)
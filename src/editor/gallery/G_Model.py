@@ -0,0 +1,158 @@
+import bisect
+from pathlib import Path
+
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle
+from PySide6.QtGui import QPixmap, QColor, QPainter, QPen, QFont, QPainterPath
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRectF
+
+from .G_Thumbs import ThumbnailService
+
+
+PathRole = Qt.ItemDataRole.UserRole + 1
+
+CARD_BG = "#252525"
+CARD_NAME_H = 24
+
+
+class ProjectListModel(QAbstractListModel):
+
+    def __init__(self, thumbs: ThumbnailService, card_w: int, card_h: int, parent=None):
+        super().__init__(parent)
+        self._thumbs = thumbs
+        self._card_w = card_w
+        self._card_h = card_h
+        self._projects: list[dict] = []
+        self._rows: dict[Path, int] = {}
+        self._thumbs.ready.connect(self._on_thumb_ready)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._projects)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._projects):
+            return None
+        project = self._projects[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return project["name"]
+        if role == PathRole:
+            return project["path"]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._preview(project["path"])
+        return None
+
+    def _preview(self, path: Path) -> QPixmap | None:
+        # Only asked for by the delegate, so only visible cards are ever decoded.
+        # None means it's still cooking; the delegate draws the placeholder meanwhile.
+        return self._thumbs.get(path / "preview.png", self._card_w, self._card_h)
+
+    def _on_thumb_ready(self, source: Path, w: int, h: int):
+        if (w, h) == (self._card_w, self._card_h):
+            self.refresh_preview(source.parent)
+
+    def set_projects(self, projects: list[dict]):
+        self.beginResetModel()
+        self._projects = list(projects)
+        self._reindex()
+        self.endResetModel()
+
+    def add_project(self, project: dict):
+        if project["path"] in self._rows:
+            self.update_project(project)
+            return
+        # Same order the index hands out: by directory name
+        row = bisect.bisect_left(self._projects, project["path"].name, key=lambda p: p["path"].name)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._projects.insert(row, project)
+        self._reindex()
+        self.endInsertRows()
+
+    def update_project(self, project: dict):
+        row = self._rows.get(project["path"])
+        if row is None:
+            self.add_project(project)
+            return
+        self._projects[row] = project
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index)
+
+    def refresh_preview(self, path: Path):
+        index = self.index_of(path)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def remove_project(self, path: Path):
+        row = self._rows.get(path)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._projects[row]
+        self._reindex()
+        self.endRemoveRows()
+
+    def _reindex(self):
+        self._rows = {p["path"]: i for i, p in enumerate(self._projects)}
+
+    def index_of(self, path: Path) -> QModelIndex:
+        row = self._rows.get(path)
+        if row is None:
+            return QModelIndex()
+        return self.index(row, 0)
+
+    def path_at(self, index: QModelIndex) -> Path | None:
+        if not index.isValid():
+            return None
+        return self.data(index, PathRole)
+
+
+class ProjectCardDelegate(QStyledItemDelegate):
+
+    def __init__(self, card_w: int, card_h: int, accent: str, placeholder: str, parent=None):
+        super().__init__(parent)
+        self._card_w = card_w
+        self._card_h = card_h
+        self._accent = QColor(accent)
+        self._placeholder = QColor(placeholder)
+        self._bg = QColor(CARD_BG)
+        self._font = QFont()
+        self._font.setPixelSize(11)
+
+    def sizeHint(self, option, index):
+        return QSize(self._card_w, self._card_h + CARD_NAME_H)
+
+    def paint(self, painter: QPainter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        rect = QRectF(option.rect.x(), option.rect.y(), self._card_w, self._card_h + CARD_NAME_H)
+        clip = QPainterPath()
+        clip.addRoundedRect(rect, 4, 4)
+        painter.fillPath(clip, self._bg)
+
+        preview_rect = QRectF(rect.x(), rect.y(), self._card_w, self._card_h)
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        painter.setClipPath(clip)
+        if isinstance(pixmap, QPixmap) and not pixmap.isNull():
+            # Thumbnails arrive pre-cropped, this only matters for odd sizes
+            sx = (pixmap.width() - self._card_w) / 2
+            sy = (pixmap.height() - self._card_h) / 2
+            painter.drawPixmap(preview_rect, pixmap, QRectF(sx, sy, self._card_w, self._card_h))
+        else:
+            painter.fillRect(preview_rect, self._placeholder)
+        painter.setClipping(False)
+
+        painter.setFont(self._font)
+        painter.setPen(QColor("#e1e1e1"))
+        name_rect = QRectF(rect.x() + 4, rect.y() + self._card_h + 2, self._card_w - 8, CARD_NAME_H - 6)
+        name = painter.fontMetrics().elidedText(
+            index.data(Qt.ItemDataRole.DisplayRole) or "", Qt.TextElideMode.ElideRight, int(name_rect.width())
+        )
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, name)
+
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(QPen(self._accent, 2))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 4, 4)
+
+        painter.restore()
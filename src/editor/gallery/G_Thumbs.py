@@ -0,0 +1,130 @@
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal
+
+
+MAX_THREADS = 4
+
+
+def _scale_crop(img: QImage, w: int, h: int) -> QImage:
+    scaled = img.scaled(w, h, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                        Qt.TransformationMode.SmoothTransformation)
+    x = (scaled.width() - w) // 2
+    y = (scaled.height() - h) // 2
+    return scaled.copy(x, y, w, h)
+
+
+class _JobSignals(QObject):
+    # key, image (null on failure), the source's generation when the job started
+    done = Signal(object, object, int)
+
+
+class _ThumbJob(QRunnable):
+
+    def __init__(self, key: tuple, generation: int, cache_dir: Path, signals: _JobSignals):
+        super().__init__()
+        self._key = key
+        self._generation = generation
+        self._cache_dir = cache_dir
+        self._signals = signals
+
+    def run(self):
+        source, w, h = self._key
+        try:
+            mtime = os.stat(source).st_mtime_ns
+        except OSError:
+            self._signals.done.emit(self._key, QImage(), self._generation)
+            return
+
+        stem = f"{hashlib.sha1(source.encode()).hexdigest()}-{w}x{h}"
+        cached = self._cache_dir / f"{stem}-{mtime}.png"
+        img = QImage(str(cached))
+        if img.isNull():
+            img = QImage(source)
+            if not img.isNull():
+                img = _scale_crop(img, w, h)
+                self._write(cached, stem, img)
+        self._signals.done.emit(self._key, img, self._generation)
+
+    def _write(self, cached: Path, stem: str, img: QImage):
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            # Older mtimes of the same preview are dead weight now
+            for old in self._cache_dir.glob(f"{stem}-*.png"):
+                old.unlink(missing_ok=True)
+            tmp = cached.with_suffix(".tmp.png")
+            if img.save(str(tmp)):
+                os.replace(tmp, cached)
+        except OSError:
+            pass
+
+
+class ThumbnailService(QObject):
+    # (source path, width, height) — ask again with get() to pick it up
+    ready = Signal(object, int, int)
+
+    def __init__(self, cache_dir: Path, budget_bytes: int, parent=None):
+        super().__init__(parent)
+        self._cache_dir = cache_dir
+        self._budget = budget_bytes
+        self._used = 0
+        # No stat on a hit: get() runs on every card paint. Rewrites come in through invalidate().
+        self._lru: OrderedDict[tuple, QPixmap] = OrderedDict()
+        # Keys that failed, so a broken preview isn't retried every paint, only once it's invalidated
+        self._failed: set[tuple] = set()
+        self._pending: set[tuple] = set()
+        # source -> bumped by invalidate(), so a job that read the old file can't cache what it made
+        self._generations: dict[str, int] = {}
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(min(MAX_THREADS, max(1, QThreadPool.globalInstance().maxThreadCount())))
+        self._signals = _JobSignals(self)
+        self._signals.done.connect(self._on_done)
+
+    def get(self, source: Path, w: int, h: int) -> QPixmap | None:
+        key = (str(source), w, h)
+        pixmap = self._lru.get(key)
+        if pixmap is not None:
+            self._lru.move_to_end(key)
+            return pixmap
+        if key in self._failed:
+            return None
+        if key not in self._pending:
+            self._pending.add(key)
+            self._pool.start(_ThumbJob(key, self._generations.get(key[0], 0), self._cache_dir, self._signals))
+        return None
+
+    def invalidate(self, source: Path):
+        source = str(source)
+        self._generations[source] = self._generations.get(source, 0) + 1
+        # Jobs still running for it are stale now; the next get() starts a fresh one
+        self._pending = {k for k in self._pending if k[0] != source}
+        for key in [k for k in self._lru if k[0] == source]:
+            self._used -= self._cost(self._lru.pop(key))
+        self._failed = {k for k in self._failed if k[0] != source}
+
+    def _cost(self, pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * 4
+
+    def _on_done(self, key: tuple, img: QImage, generation: int):
+        if generation != self._generations.get(key[0], 0):
+            return
+        self._pending.discard(key)
+        old = self._lru.pop(key, None)
+        if old is not None:
+            self._used -= self._cost(old)
+        if img.isNull():
+            self._failed.add(key)
+            return
+        self._failed.discard(key)
+        pixmap = QPixmap.fromImage(img)
+        self._lru[key] = pixmap
+        self._used += self._cost(pixmap)
+        while self._used > self._budget and len(self._lru) > 1:
+            _, evicted = self._lru.popitem(last=False)
+            self._used -= self._cost(evicted)
+        self.ready.emit(Path(key[0]), key[1], key[2])
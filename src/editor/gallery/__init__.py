@@ -0,0 +1,2 @@
+from .G_Model import ProjectListModel, ProjectCardDelegate, PathRole
+from .G_Thumbs import ThumbnailService
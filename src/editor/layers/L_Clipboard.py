@@ -0,0 +1,163 @@
+import json
+import math
+import re
+import threading
+from pathlib import Path
+
+from PySide6.QtCore import QMimeData, QObject, Signal
+
+from .L_Model import Layer, LayerStack, layer_from_dict
+
+
+# Layers on the clipboard are descriptors only: their manifest dicts, with images/videos/audio referenced
+# by asset hash. A pasted copy of a heavy image layer is a few hundred bytes of manifest pointing at the
+# same asset, so the editor draws it from the same pyramid and the same mapped pixels.
+LAYERS_MIME = "application/x-awe-layers"
+CLIPBOARD_VERSION = 1
+# sha256 hex, the only thing an asset store names its objects by. Clipboard data comes from anywhere,
+# so anything else never gets near a path.
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+
+def asset_refs(data: dict) -> list[str]:
+    # Asset hashes a layer dict points at
+    refs = []
+    if isinstance(data.get("asset"), str):
+        refs.append(data["asset"])
+    if isinstance(data.get("frames"), list):
+        refs += [f for f in data["frames"] if isinstance(f, str)]
+    if data.get("type") == "audio_reactive" and isinstance(data.get("source"), str):
+        refs.append(data["source"])
+    return refs
+
+
+def _is_digest(value) -> bool:
+    return isinstance(value, str) and _DIGEST.fullmatch(value) is not None
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _is_pair(value, keys: tuple) -> bool:
+    return isinstance(value, dict) and value.keys() == set(keys) and all(_is_number(value[k]) for k in keys)
+
+
+def _valid_layer(data: dict) -> bool:
+    # Everything the canvas paints from has to have the type it's painted as; a manifest on disk is ours,
+    # a clipboard isn't
+    kind = data.get("type")
+    if "name" in data and not isinstance(data["name"], str):
+        return False
+    if "visible" in data and not isinstance(data["visible"], bool):
+        return False
+    if "position" in data and not _is_pair(data["position"], ("x", "y")):
+        return False
+    if "size" in data and not _is_pair(data["size"], ("width", "height")):
+        return False
+    if "color" in data and not isinstance(data["color"], str):
+        return False
+    if kind == "image":
+        return _is_digest(data.get("asset"))
+    if kind == "video":
+        if "fps" in data and not (_is_number(data["fps"]) and data["fps"] > 0):
+            return False
+        if "asset" in data:
+            return _is_digest(data["asset"]) and "frames" not in data
+        frames = data.get("frames")
+        return isinstance(frames, list) and bool(frames) and all(_is_digest(f) for f in frames)
+    if kind == "audio_reactive":
+        # No source is live input
+        return "source" not in data or _is_digest(data["source"])
+    return True
+
+
+def layers_to_mime(layers: list[Layer], assets_root: Path) -> QMimeData:
+    # assets_root lets a paste into another library find the files it doesn't have yet
+    payload = {
+        "version": CLIPBOARD_VERSION,
+        "assets": str(assets_root),
+        "layers": [layer.to_dict() for layer in layers if not layer.is_canvas],
+    }
+    mime = QMimeData()
+    mime.setData(LAYERS_MIME, json.dumps(payload, separators=(",", ":")).encode())
+    return mime
+
+
+def layer_dicts_from_mime(mime: QMimeData | None) -> tuple[Path, list[dict]]:
+    # The assets root the layers were copied from and their dicts, minus anything malformed
+    if mime is None or not mime.hasFormat(LAYERS_MIME):
+        return Path(), []
+    try:
+        payload = json.loads(bytes(mime.data(LAYERS_MIME)))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return Path(), []
+    if not isinstance(payload, dict) or payload.get("version") != CLIPBOARD_VERSION:
+        return Path(), []
+    source_root = payload.get("assets")
+    layers = payload.get("layers")
+    if not isinstance(source_root, str) or not isinstance(layers, list):
+        return Path(), []
+    return Path(source_root), [data for data in layers
+                               if isinstance(data, dict) and data.get("type") != "canvas" and _valid_layer(data)]
+
+
+def missing_assets(layers: list[dict], source_root: Path, assets) -> list[str]:
+    # Hashes that have to come over from another library before these layers can be pasted
+    if source_root == assets.root:
+        return []
+    return list(dict.fromkeys(d for data in layers for d in asset_refs(data) if not assets.has(d)))
+
+
+def import_assets(assets, source_root: Path, digests: list[str], cancel: threading.Event | None = None) -> set[str]:
+    # Copies the objects over from source_root's store (same layout, different root). Returns the hashes
+    # that arrived as something else: a corrupt or replaced object on the other side.
+    source = type(assets)(source_root)
+    bad = set()
+    for digest in digests:
+        if cancel is not None and cancel.is_set():
+            break
+        try:
+            if assets.import_file(source.object_path(digest)) != digest:
+                bad.add(digest)
+        except OSError:
+            # Gone from the other library too; the layer keeps its reference and draws nothing
+            pass
+    return bad
+
+
+def layers_from_dicts(layers: list[dict], stack: LayerStack, bad: set[str] = frozenset()) -> list[Layer]:
+    # New layers with fresh ids, ready to insert; the ones pointing at a hash in bad are dropped
+    next_id = stack.next_id()
+    out = []
+    for data in layers:
+        if bad and not bad.isdisjoint(asset_refs(data)):
+            continue
+        out.append(layer_from_dict(dict(data, id=next_id)))
+        next_id += 1
+    return out
+
+
+class PasteJob(QObject):
+    # import_assets on a worker thread, for pastes from another library. Signals arrive on the thread that
+    # created the job; ids are handed out there too, once the stack is what the layers land in.
+    finished = Signal(object, object)
+
+    def __init__(self, assets, source_root: Path, layers: list[dict], digests: list[str], parent=None):
+        super().__init__(parent)
+        self.layers = layers
+        self._assets = assets
+        self._source_root = source_root
+        self._digests = digests
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="PasteImport", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _run(self):
+        bad = import_assets(self._assets, self._source_root, self._digests, self._cancel)
+        self.finished.emit(self.layers, bad)
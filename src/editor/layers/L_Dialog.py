@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QTreeWidget, QTreeWidgetItem,
+    QDialog, QVBoxLayout, QTreeWidget, QTreeWidgetItem, QDialogButtonBox,
 )
 from PySide6.QtCore import Qt
 
@@ -22,6 +22,8 @@ class AddLayerDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Add Layer")
         self.setFixedSize(320, 300)
+        # Label of the picked entry once accepted, e.g. "Image Layer"
+        self.selected_type = None
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -42,3 +44,19 @@ class AddLayerDialog(QDialog):
             category_item.setExpanded(True)
 
         layout.addWidget(tree)
+        self._tree = tree
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self._on_accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        tree.itemDoubleClicked.connect(lambda item, _col: self._on_accept())
+
+    def _on_accept(self):
+        item = self._tree.currentItem()
+        if item is None or item.parent() is None:
+            return
+        self.selected_type = item.text(0)
+        self.accept()
@@ -0,0 +1,276 @@
+class Layer:
+    # Keys living in slots. Anything else in the manifest rides along in `extra`, so nothing gets lost on save.
+    __slots__ = ("id", "name", "type", "visible", "extra")
+    TYPE = None
+
+    def __init__(self, id=None, name=None, type=None, visible=None, extra=None):
+        self.id = id
+        self.name = name
+        self.type = type if type is not None else self.TYPE
+        # None means "not in the manifest", which reads as visible
+        self.visible = visible
+        self.extra = extra
+
+    @property
+    def is_visible(self) -> bool:
+        return self.visible is not False
+
+    @property
+    def is_canvas(self) -> bool:
+        return False
+
+    @property
+    def display_name(self) -> str:
+        return self.name if self.name is not None else f"Layer {self.id}"
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Layer":
+        layer = cls.__new__(cls)
+        rest = dict(data)
+        Layer.__init__(
+            layer,
+            id=rest.pop("id", None),
+            name=rest.pop("name", None),
+            type=rest.pop("type", None),
+            visible=rest.pop("visible", None),
+        )
+        layer._load(rest)
+        layer.extra = rest or None
+        return layer
+
+    def _load(self, rest: dict):
+        pass
+
+    def to_dict(self) -> dict:
+        # Same key order AWE writes new projects with
+        out = {}
+        if self.id is not None:
+            out["id"] = self.id
+        if self.name is not None:
+            out["name"] = self.name
+        if self.type is not None:
+            out["type"] = self.type
+        self._dump_head(out)
+        if self.visible is not None:
+            out["visible"] = self.visible
+        self._dump_tail(out)
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    def _dump_head(self, out: dict):
+        pass
+
+    def _dump_tail(self, out: dict):
+        pass
+
+    def copy(self) -> "Layer":
+        return type(self).from_dict(self.to_dict())
+
+
+class CanvasLayer(Layer):
+    # source is a tile folder on new projects (tile_size set), canvas.png on old ones
+    __slots__ = ("source", "tile_size")
+    TYPE = "canvas"
+
+    @property
+    def is_canvas(self) -> bool:
+        return True
+
+    def _load(self, rest: dict):
+        self.source = rest.pop("source", None)
+        self.tile_size = rest.pop("tile_size", None)
+
+    def _dump_head(self, out: dict):
+        if self.source is not None:
+            out["source"] = self.source
+        if self.tile_size is not None:
+            out["tile_size"] = self.tile_size
+
+
+class RectLayer(Layer):
+    # position/size flattened into slots; None when the manifest leaves them out (then it's the whole canvas)
+    __slots__ = ("x", "y", "width", "height")
+
+    def _load(self, rest: dict):
+        self.x = self.y = self.width = self.height = None
+        pos = rest.get("position")
+        if isinstance(pos, dict) and pos.keys() == {"x", "y"}:
+            self.x, self.y = pos["x"], pos["y"]
+            del rest["position"]
+        size = rest.get("size")
+        if isinstance(size, dict) and size.keys() == {"width", "height"}:
+            self.width, self.height = size["width"], size["height"]
+            del rest["size"]
+
+    def _dump_tail(self, out: dict):
+        if self.x is not None:
+            out["position"] = {"x": self.x, "y": self.y}
+        if self.width is not None:
+            out["size"] = {"width": self.width, "height": self.height}
+
+    def bounds(self, canvas_w: int, canvas_h: int) -> tuple:
+        x = self.x if self.x is not None else 0
+        y = self.y if self.y is not None else 0
+        w = self.width if self.width is not None else canvas_w
+        h = self.height if self.height is not None else canvas_h
+        return x, y, w, h
+
+
+class SolidColorLayer(RectLayer):
+    __slots__ = ("color",)
+    TYPE = "solid_color"
+
+    def _load(self, rest: dict):
+        self.color = rest.pop("color", None)
+        super()._load(rest)
+
+    def _dump_head(self, out: dict):
+        if self.color is not None:
+            out["color"] = self.color
+
+    @property
+    def fill(self) -> str:
+        return self.color if self.color is not None else "#ffffff"
+
+
+class ImageLayer(RectLayer):
+    # asset is the sha256 of the imported file in the library's shared asset store
+    __slots__ = ("asset",)
+    TYPE = "image"
+
+    def _load(self, rest: dict):
+        self.asset = rest.pop("asset", None)
+        super()._load(rest)
+
+    def _dump_head(self, out: dict):
+        if self.asset is not None:
+            out["asset"] = self.asset
+
+
+class VideoLayer(RectLayer):
+    # Either one video file (asset) or an image sequence (frames, a list of assets), played at fps
+    __slots__ = ("asset", "frames", "fps")
+    TYPE = "video"
+
+    def _load(self, rest: dict):
+        self.asset = rest.pop("asset", None)
+        self.frames = rest.pop("frames", None)
+        self.fps = rest.pop("fps", None)
+        super()._load(rest)
+
+    def _dump_head(self, out: dict):
+        if self.asset is not None:
+            out["asset"] = self.asset
+        if self.frames is not None:
+            out["frames"] = self.frames
+        if self.fps is not None:
+            out["fps"] = self.fps
+
+
+class AudioReactiveLayer(RectLayer):
+    # source: asset hash of a WAV file, or None for live input. Drawn as band bars in color.
+    __slots__ = ("source", "color")
+    TYPE = "audio_reactive"
+
+    def _load(self, rest: dict):
+        self.source = rest.pop("source", None)
+        self.color = rest.pop("color", None)
+        super()._load(rest)
+
+    def _dump_head(self, out: dict):
+        if self.source is not None:
+            out["source"] = self.source
+        if self.color is not None:
+            out["color"] = self.color
+
+    @property
+    def fill(self) -> str:
+        return self.color if self.color is not None else "#3A41E1"
+
+
+class GenericLayer(Layer):
+    # Types this editor doesn't know yet; everything stays in extra
+    __slots__ = ()
+
+
+LAYER_CLASSES = {
+    CanvasLayer.TYPE: CanvasLayer,
+    SolidColorLayer.TYPE: SolidColorLayer,
+    ImageLayer.TYPE: ImageLayer,
+    VideoLayer.TYPE: VideoLayer,
+    AudioReactiveLayer.TYPE: AudioReactiveLayer,
+}
+
+
+def layer_from_dict(data: dict) -> Layer:
+    return LAYER_CLASSES.get(data.get("type"), GenericLayer).from_dict(data)
+
+
+class LayerStack:
+    # Bottom to top, same as the manifest's layers array
+    __slots__ = ("_by_id", "_order", "_z")
+
+    def __init__(self, layers=()):
+        self._by_id: dict = {}
+        self._order: list[Layer] = []
+        self._z = None
+        for layer in layers:
+            self._order.append(layer)
+            self._by_id[layer.id] = layer
+
+    @classmethod
+    def from_manifest(cls, layers: list) -> "LayerStack":
+        return cls(layer_from_dict(d) for d in layers if isinstance(d, dict))
+
+    @classmethod
+    def from_bundle(cls, bundle) -> "LayerStack":
+        # Every record up front: the layer rows and the spatial grid look at every layer on open anyway
+        return cls.from_manifest([bundle.layer_dict(i) for i in range(len(bundle))])
+
+    def to_manifest(self) -> list[dict]:
+        return [layer.to_dict() for layer in self._order]
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, layer_id):
+        return layer_id in self._by_id
+
+    def get(self, layer_id, default=None):
+        return self._by_id.get(layer_id, default)
+
+    def z_index(self, layer_id) -> int:
+        if self._z is None:
+            self._z = {layer.id: i for i, layer in enumerate(self._order)}
+        return self._z[layer_id]
+
+    def next_id(self) -> int:
+        ids = [i for i in self._by_id if isinstance(i, int)]
+        return max(ids, default=-1) + 1
+
+    def insert(self, layer: Layer, index: int | None = None):
+        # On top, which is where pastes and redos land, the z map stays valid; anywhere else it's rebuilt
+        if index is None or index >= len(self._order):
+            self._order.append(layer)
+            if self._z is not None:
+                self._z[layer.id] = len(self._order) - 1
+        else:
+            self._order.insert(index, layer)
+            self._z = None
+        self._by_id[layer.id] = layer
+
+    def remove(self, layer_id) -> tuple[Layer, int] | None:
+        if layer_id not in self._by_id:
+            return None
+        index = self.z_index(layer_id)
+        layer = self._by_id.pop(layer_id)
+        del self._order[index]
+        if index == len(self._order) and self._z is not None:
+            del self._z[layer_id]
+        else:
+            self._z = None
+        return layer, index
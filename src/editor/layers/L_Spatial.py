@@ -0,0 +1,104 @@
+from .L_Model import LayerStack, RectLayer
+
+
+# Roughly this many cells along the long side of the canvas
+GRID_CELLS = 32
+MIN_CELL = 64
+
+
+class LayerGrid:
+    # Uniform grid over canvas coordinates. Each cell holds the ids of the layers whose bounds touch it,
+    # so "what's in this rect" / "what's under this point" only looks at a few cells instead of every layer.
+
+    def __init__(self, canvas_w: int, canvas_h: int):
+        self._cell = max(MIN_CELL, max(canvas_w, canvas_h) / GRID_CELLS)
+        self._cols = max(1, int(canvas_w // self._cell) + 1)
+        self._rows = max(1, int(canvas_h // self._cell) + 1)
+        self._cells: dict[tuple, set] = {}
+        # id -> (bounds, cell keys) so a layer can be moved or dropped without searching for it
+        self._entries: dict = {}
+
+    @classmethod
+    def from_stack(cls, layers: LayerStack, canvas_w: int, canvas_h: int) -> "LayerGrid":
+        grid = cls(canvas_w, canvas_h)
+        for layer in layers:
+            if isinstance(layer, RectLayer):
+                grid.insert(layer.id, layer.bounds(canvas_w, canvas_h))
+        return grid
+
+    def _span(self, x: float, y: float, w: float, h: float):
+        # Anything hanging off the canvas lands in the edge cells
+        c0 = min(max(int(x // self._cell), 0), self._cols - 1)
+        r0 = min(max(int(y // self._cell), 0), self._rows - 1)
+        c1 = min(max(int((x + w) // self._cell), 0), self._cols - 1)
+        r1 = min(max(int((y + h) // self._cell), 0), self._rows - 1)
+        return c0, r0, c1, r1
+
+    def __contains__(self, layer_id):
+        return layer_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def insert(self, layer_id, bounds: tuple):
+        if layer_id in self._entries:
+            self.remove(layer_id)
+        x, y, w, h = bounds
+        if w <= 0 or h <= 0:
+            return
+        c0, r0, c1, r1 = self._span(x, y, w, h)
+        keys = [(c, r) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)]
+        for key in keys:
+            self._cells.setdefault(key, set()).add(layer_id)
+        self._entries[layer_id] = (bounds, keys)
+
+    def remove(self, layer_id):
+        entry = self._entries.pop(layer_id, None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            cell = self._cells[key]
+            cell.discard(layer_id)
+            if not cell:
+                del self._cells[key]
+
+    def query(self, x: float, y: float, w: float, h: float) -> set:
+        # Ids whose bounds overlap the rect
+        c0, r0, c1, r1 = self._span(x, y, w, h)
+        found = set()
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                cell = self._cells.get((c, r))
+                if cell:
+                    found |= cell
+        x1, y1 = x + w, y + h
+        out = set()
+        for layer_id in found:
+            lx, ly, lw, lh = self._entries[layer_id][0]
+            if lx < x1 and x < lx + lw and ly < y1 and y < ly + lh:
+                out.add(layer_id)
+        return out
+
+    def at(self, x: float, y: float) -> list:
+        # Ids whose bounds contain the point; only one cell to look at
+        c, r, _, _ = self._span(x, y, 0, 0)
+        out = []
+        for layer_id in self._cells.get((c, r), ()):
+            lx, ly, lw, lh = self._entries[layer_id][0]
+            if lx <= x < lx + lw and ly <= y < ly + lh:
+                out.append(layer_id)
+        return out
+
+
+def topmost_layer_at(layers: LayerStack, grid: LayerGrid, x: float, y: float):
+    # Highest visible layer under the point, or None
+    best = None
+    best_z = -1
+    for layer_id in grid.at(x, y):
+        layer = layers.get(layer_id)
+        if layer is None or not layer.is_visible:
+            continue
+        z = layers.z_index(layer_id)
+        if z > best_z:
+            best, best_z = layer, z
+    return best
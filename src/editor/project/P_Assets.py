@@ -0,0 +1,204 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from PySide6.QtGui import QImage
+
+from layers.L_Clipboard import asset_refs
+
+from .P_Index import manifest_path
+from .P_Store import _fsync_dir, read_manifest
+
+
+# Shared by every project in the library: PROJECTS_DIR/.assets
+#   objects/<2 hex>/<sha256>   the imported file, byte for byte
+#   decoded/<sha256>.rgba      header + premultiplied ARGB32 pixels, mmapped on open
+#   .lock                      flock'd by an import reusing an object and by a sweep deleting objects
+ASSETS_DIR = ".assets"
+CHUNK = 1024 * 1024
+_RGBA_MAGIC = b"AWRGBA01"
+_RGBA_HEADER = struct.Struct("<8sII")
+# A sweep leaves anything this fresh alone: an import whose layer hasn't been saved yet, a clone halfway in
+SWEEP_GRACE_S = 3600
+
+
+def assets_for(project_path: Path) -> "AssetStore":
+    return AssetStore(project_path.parent / ASSETS_DIR)
+
+
+class AssetStore:
+
+    def __init__(self, root: Path):
+        self.root = root
+        # Open maps stay alive as long as the QImages pointing into them
+        self._maps: dict[str, tuple[mmap.mmap, QImage]] = {}
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def _decoded_path(self, digest: str) -> Path:
+        return self.root / "decoded" / f"{digest}.rgba"
+
+    def import_file(self, source: Path) -> str:
+        # Hash while copying to a temp file; if the content is already stored the copy is just dropped
+        objects = self.root / "objects"
+        objects.mkdir(parents=True, exist_ok=True)
+        # Per thread: a paste from another library imports in the background while the UI may import too
+        tmp = objects / f".import-{os.getpid()}-{threading.get_ident()}.tmp"
+        sha = hashlib.sha256()
+        try:
+            with open(source, "rb") as src, open(tmp, "wb") as dst:
+                while chunk := src.read(CHUNK):
+                    sha.update(chunk)
+                    dst.write(chunk)
+                dst.flush()
+                os.fsync(dst.fileno())
+            digest = sha.hexdigest()
+            target = self.object_path(digest)
+            with self._locked():
+                if target.exists():
+                    # Back in use, so it gets the same grace from a sweep as a fresh import
+                    os.utime(target)
+                    return digest
+                target.parent.mkdir(exist_ok=True)
+                os.replace(tmp, target)
+            _fsync_dir(target.parent)
+            return digest
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        # Excludes other threads and other processes (an AWC running on its own) alike: flock locks belong
+        # to the open file, not the process
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def has(self, digest: str) -> bool:
+        return self.object_path(digest).exists()
+
+    def image(self, digest: str) -> QImage | None:
+        # Premultiplied ARGB32, straight out of the mmapped cache when there is one
+        cached = self._maps.get(digest)
+        if cached is not None:
+            return cached[1]
+        img = self._map_decoded(digest)
+        if img is not None:
+            return img
+        img = QImage(str(self.object_path(digest)))
+        if img.isNull():
+            return None
+        img = img.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        self._write_decoded(digest, img)
+        return img
+
+    def _map_decoded(self, digest: str) -> QImage | None:
+        try:
+            with open(self._decoded_path(digest), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        # A crash can leave this short (it's written without fsync); anything off reads as a miss and decodes again
+        if len(mm) < _RGBA_HEADER.size:
+            mm.close()
+            return None
+        magic, width, height = _RGBA_HEADER.unpack_from(mm)
+        if magic != _RGBA_MAGIC or len(mm) != _RGBA_HEADER.size + width * height * 4:
+            mm.close()
+            return None
+        # No copy: the pages come in from the page cache as the image gets drawn
+        pixels = memoryview(mm)[_RGBA_HEADER.size:]
+        img = QImage(pixels, width, height, width * 4, QImage.Format.Format_ARGB32_Premultiplied)
+        self._maps[digest] = (mm, img)
+        return img
+
+    def _write_decoded(self, digest: str, img: QImage):
+        path = self._decoded_path(digest)
+        tmp = path.with_name(f".{path.name}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # ARGB32 rows are always width * 4 bytes, so the bits are the whole payload
+            with open(tmp, "wb") as f:
+                f.write(_RGBA_HEADER.pack(_RGBA_MAGIC, img.width(), img.height()))
+                f.write(bytes(img.constBits())[:img.width() * img.height() * 4])
+            os.replace(tmp, path)
+        except OSError:
+            # It's only a cache; next open decodes again
+            tmp.unlink(missing_ok=True)
+
+    def sweep(self, keep: set[str], grace_s: float = SWEEP_GRACE_S, on_remove=None) -> int:
+        # Deletes every object not in keep, its decoded cache, and temp files a crash left behind.
+        # on_remove(path) hears about each object deleted, for caches derived from it. Returns the bytes freed.
+        cutoff = time.time() - grace_s
+        freed = 0
+        for folder in (self.root / "objects", self.root / "decoded"):
+            try:
+                entries = list(folder.iterdir())
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir():
+                    for obj in entry.iterdir():
+                        if obj.name not in keep:
+                            # The mtime check and the unlink happen under the lock, so an import that
+                            # reuses this object either touched it already or waits until it's gone
+                            with self._locked():
+                                freed += _remove_older(obj, cutoff)
+                            if on_remove is not None and not obj.exists():
+                                on_remove(obj)
+                elif entry.name.startswith("."):
+                    freed += _remove_older(entry, cutoff)
+                elif entry.suffix == ".rgba":
+                    digest = entry.stem
+                    # Its object is gone, so nothing could ever map it again, however recently it was written
+                    if digest not in keep and not self.has(digest):
+                        freed += _remove_older(entry, math.inf)
+        return freed
+
+
+def _remove_older(path: Path, cutoff: float) -> int:
+    try:
+        st = path.stat()
+        if st.st_mtime > cutoff:
+            return 0
+        path.unlink()
+    except OSError:
+        return 0
+    return st.st_size
+
+
+def sweep_library(projects_dir: Path, grace_s: float = SWEEP_GRACE_S, on_remove=None) -> int | None:
+    # Drops assets no project in the library references any more: deleted projects and layers, cuts that
+    # were never pasted. None, and nothing deleted, if a manifest couldn't be read, since then there's no
+    # telling what it still needs.
+    keep = set()
+    try:
+        entries = list(os.scandir(projects_dir))
+    except OSError:
+        return None
+    for entry in entries:
+        # Dot folders are library internals, the asset store itself among them
+        if entry.name.startswith(".") or not entry.is_dir():
+            continue
+        project = Path(entry.path)
+        if not manifest_path(project).exists():
+            continue
+        try:
+            data = read_manifest(project)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict):
+            return None
+        for layer in data.get("layers") or []:
+            if isinstance(layer, dict):
+                keep.update(asset_refs(layer))
+    return AssetStore(projects_dir / ASSETS_DIR).sweep(keep, grace_s, on_remove)
@@ -0,0 +1,101 @@
+import json
+import mmap
+import struct
+from pathlib import Path
+
+
+# Optional compact manifest, picked by format_version. Layout, little-endian:
+#   header     magic, bundle version, flags, head length, layer count
+#   head       compact JSON of the manifest minus the layer data (name, id, resolution, ...)
+#   table      one entry per layer, bottom to top: record offset, record length, int id if it has one
+#   records    compact JSON per layer
+# The launcher reads header + head and stops; the editor decodes every record on open.
+BUNDLE_NAME = "project.awp"
+JSON_FORMAT = "1.0.0"
+BUNDLE_FORMAT = "2.0.0"
+_MAGIC = b"AWPB"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHII")
+_ENTRY = struct.Struct("<QI?q")
+
+
+def is_bundle_format(format_version) -> bool:
+    return str(format_version).split(".")[0] == BUNDLE_FORMAT.split(".")[0]
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def encode_bundle(head: dict, records) -> bytes:
+    # records: (layer id, JSON bytes) bottom to top
+    records = list(records)
+    head_bytes = _dumps({k: (None if k == "layers" else v) for k, v in head.items()})
+    offset = _HEADER.size + len(head_bytes) + _ENTRY.size * len(records)
+    parts = [_HEADER.pack(_MAGIC, _VERSION, 0, len(head_bytes), len(records)), head_bytes]
+    for layer_id, raw in records:
+        int_id = isinstance(layer_id, int) and not isinstance(layer_id, bool)
+        parts.append(_ENTRY.pack(offset, len(raw), int_id, layer_id if int_id else 0))
+        offset += len(raw)
+    parts.extend(raw for _, raw in records)
+    return b"".join(parts)
+
+
+def encode_manifest(manifest: dict) -> bytes:
+    layers = [d for d in manifest.get("layers") or [] if isinstance(d, dict)]
+    return encode_bundle(manifest, ((d.get("id"), _dumps(d)) for d in layers))
+
+
+def read_head(path: Path) -> dict | None:
+    # Just the header and the head: a few hundred bytes, however many layers there are
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return None
+            magic, version, _, head_len, _ = _HEADER.unpack(header)
+            if magic != _MAGIC or version != _VERSION:
+                return None
+            head = json.loads(f.read(head_len))
+    except (OSError, json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return head if isinstance(head, dict) else None
+
+
+class BundleReader:
+    # Maps the file and parses the table; layer records stay bytes on the map until someone asks
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._buf) < _HEADER.size:
+            raise ValueError("bundle header is truncated")
+        magic, version, _, head_len, count = _HEADER.unpack_from(self._buf)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("not a project bundle")
+        start = _HEADER.size
+        self.head = json.loads(self._buf[start:start + head_len])
+        if not isinstance(self.head, dict):
+            raise ValueError("bundle head isn't an object")
+        table = start + head_len
+        if table + count * _ENTRY.size > len(self._buf):
+            raise ValueError("bundle layer table is truncated")
+        self._entries = [_ENTRY.unpack_from(self._buf, table + i * _ENTRY.size) for i in range(count)]
+        for offset, length, _, _ in self._entries:
+            if offset + length > len(self._buf):
+                raise ValueError("bundle layer record is truncated")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def record(self, index: int) -> bytes:
+        offset, length, _, _ = self._entries[index]
+        return self._buf[offset:offset + length]
+
+    def layer_dict(self, index: int) -> dict:
+        return json.loads(self.record(index))
+
+    def manifest(self) -> dict:
+        # Everything, as the JSON manifest would have it
+        return {k: ([self.layer_dict(i) for i in range(len(self))] if k == "layers" else v)
+                for k, v in self.head.items()}
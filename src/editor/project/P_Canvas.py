@@ -0,0 +1,86 @@
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from PySide6.QtGui import QImage
+
+
+# New projects keep their canvas as a folder of tiles: canvas/<tx>_<ty>.png, only for tiles with
+# something in them. Size comes from the manifest, so a blank canvas of any size is an empty folder.
+CANVAS_DIR = "canvas"
+TILE_SIZE = 512
+TILE_CACHE = 64
+
+
+def create_canvas(project_path: Path) -> str:
+    # Constant time whatever the resolution; returns the layer's source
+    (project_path / CANVAS_DIR).mkdir(exist_ok=True)
+    return CANVAS_DIR
+
+
+def is_tiled(source: Path) -> bool:
+    return source.is_dir()
+
+
+class TiledCanvas:
+
+    def __init__(self, root: Path, width: int, height: int, tile_size: int | None = None):
+        self.root = root
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size or TILE_SIZE
+        self._stored = None
+        self._cache: OrderedDict = OrderedDict()
+
+    @property
+    def stored(self) -> set:
+        # One directory listing tells us every non-empty tile; empty ones never touch the disk again
+        if self._stored is None:
+            self._stored = set()
+            try:
+                with os.scandir(self.root) as it:
+                    for entry in it:
+                        stem, dot, ext = entry.name.partition(".")
+                        tx, _, ty = stem.partition("_")
+                        if ext == "png" and tx.isdigit() and ty.isdigit():
+                            self._stored.add((int(tx), int(ty)))
+            except OSError:
+                pass
+        return self._stored
+
+    def tile_rect(self, tx: int, ty: int) -> tuple[int, int, int, int]:
+        # Edge tiles are cut to the canvas, and stored at that size
+        x = tx * self.tile_size
+        y = ty * self.tile_size
+        return x, y, min(self.tile_size, self.width - x), min(self.tile_size, self.height - y)
+
+    def tiles_in(self, x: float, y: float, w: float, h: float) -> list[tuple[int, int]]:
+        # Stored tiles overlapping a canvas-space rect
+        size = self.tile_size
+        tx0 = max(int(x // size), 0)
+        ty0 = max(int(y // size), 0)
+        tx1 = min(int((min(x + w, self.width) - 1) // size), (self.width - 1) // size)
+        ty1 = min(int((min(y + h, self.height) - 1) // size), (self.height - 1) // size)
+        stored = self.stored
+        if (tx1 - tx0 + 1) * (ty1 - ty0 + 1) > len(stored):
+            return sorted(t for t in stored if tx0 <= t[0] <= tx1 and ty0 <= t[1] <= ty1)
+        return [(tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1) if (tx, ty) in stored]
+
+    def _path(self, tx: int, ty: int) -> Path:
+        return self.root / f"{tx}_{ty}.png"
+
+    def load(self, tx: int, ty: int) -> QImage | None:
+        key = (tx, ty)
+        img = self._cache.get(key)
+        if img is not None:
+            self._cache.move_to_end(key)
+            return img
+        if key not in self.stored:
+            return None
+        img = QImage(str(self._path(tx, ty)))
+        if img.isNull():
+            return None
+        self._cache[key] = img
+        if len(self._cache) > TILE_CACHE:
+            self._cache.popitem(last=False)
+        return img
@@ -0,0 +1,221 @@
+import errno
+import os
+import random
+import shutil
+import string
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Signal
+
+from layers.L_Clipboard import asset_refs
+
+from .P_Assets import assets_for, CHUNK
+from .P_Store import read_manifest, write_manifest
+
+
+# linux/fs.h: share the source's extents instead of copying them (btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+# Progress callbacks fire at most this often; a chunk loop would otherwise flood the UI thread
+PROGRESS_INTERVAL_S = 0.05
+
+
+def generate_project_id() -> str:
+    # ID is better than name eh?
+    timestamp = datetime.now().strftime("%d%m%y%H%M%S")
+    suffix = ''.join(random.choice(string.ascii_uppercase) for _ in range(3))
+    return f"{timestamp}-{suffix}"
+
+
+def new_project_dir(projects_dir: Path) -> Path:
+    # Not created yet, just free
+    path = projects_dir / generate_project_id()
+    # Extremely unlikely but handle ID collision
+    while path.exists():
+        path = projects_dir / generate_project_id()
+    return path
+
+
+class CloneCancelled(Exception):
+    pass
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    try:
+        import fcntl
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def clone_file(src: Path, dst: Path, progress=None, cancel: threading.Event | None = None) -> str:
+    # "reflink" when the filesystem can share the data, else "copy" in CHUNK pieces.
+    # progress(n) gets the bytes done since the last call.
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if _reflink(fsrc.fileno(), fdst.fileno()):
+            if progress is not None:
+                progress(os.fstat(fsrc.fileno()).st_size)
+            return "reflink"
+        in_kernel = hasattr(os, "copy_file_range")
+        buf = None
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise CloneCancelled()
+            n = 0
+            if in_kernel:
+                try:
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), CHUNK)
+                except OSError as e:
+                    if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                        raise
+                    in_kernel = False
+                    continue
+            else:
+                if buf is None:
+                    buf = bytearray(CHUNK)
+                n = fsrc.readinto(buf)
+                if n:
+                    fdst.write(memoryview(buf)[:n])
+            if not n:
+                break
+            if progress is not None:
+                progress(n)
+    shutil.copymode(src, dst)
+    return "copy"
+
+
+def _link_asset(src: Path, dst: Path, progress, cancel) -> str:
+    # Asset objects never change once written, so another library can simply hard link them
+    if dst.exists():
+        return "linked"
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, dst)
+        if progress is not None:
+            progress(src.stat().st_size)
+        return "linked"
+    except OSError:
+        return clone_file(src, dst, progress, cancel)
+
+
+def _is_temp(name: str) -> bool:
+    # write_atomic's in-flight files: half written, and gone again a moment later
+    return name.startswith(".") and name.endswith(".tmp")
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.lstat().st_size if path.is_symlink() else path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def clone_project(src: Path, dst: Path, name: str | None = None, progress=None,
+                  cancel: threading.Event | None = None) -> dict:
+    # Copies src into dst (which must not exist) under dst's name as the new id. It's built in a hidden
+    # folder next to dst and renamed in at the end, so the launcher never sees half a project.
+    # progress(done, total) in bytes. Returns how many files were reflinked/linked/copied.
+    src_assets = assets_for(src)
+    dst_assets = assets_for(dst)
+    jobs = []
+    # Every folder is recreated, empty ones too (a fresh project's canvas/ tile folder has nothing in it)
+    folders = []
+    for root, dirs, files in os.walk(src):
+        rel = Path(root).relative_to(src)
+        for d in dirs:
+            if (Path(root) / d).is_symlink():
+                # os.walk doesn't follow these; they're copied as links, like symlinked files
+                jobs.append((Path(root) / d, rel / d, False))
+            else:
+                folders.append(rel / d)
+        for f in files:
+            if not _is_temp(f):
+                jobs.append((Path(root) / f, rel / f, False))
+    if src_assets.root.resolve() != dst_assets.root.resolve():
+        # Different library: bring the referenced assets along
+        data = read_manifest(src)
+        for layer in data.get("layers") or []:
+            if isinstance(layer, dict):
+                for digest in asset_refs(layer):
+                    if src_assets.has(digest):
+                        jobs.append((src_assets.object_path(digest), dst_assets.object_path(digest), True))
+    total = sum(_size(path) for path, _, _ in jobs)
+    done = 0
+    last = 0.0
+
+    def step(n):
+        nonlocal done, last
+        done += n
+        now = time.monotonic()
+        if progress is not None and now - last >= PROGRESS_INTERVAL_S:
+            last = now
+            progress(done, total)
+
+    partial = dst.with_name(f".{dst.name}.partial")
+    stats = {"reflink": 0, "linked": 0, "copy": 0}
+    try:
+        partial.mkdir(parents=True)
+        for rel in folders:
+            (partial / rel).mkdir(parents=True, exist_ok=True)
+        for path, target, is_asset in jobs:
+            if is_asset:
+                stats[_link_asset(path, target, step, cancel)] += 1
+                continue
+            out = partial / target
+            out.parent.mkdir(parents=True, exist_ok=True)
+            if path.is_symlink():
+                os.symlink(os.readlink(path), out)
+                continue
+            try:
+                stats[clone_file(path, out, step, cancel)] += 1
+            except FileNotFoundError:
+                if path.exists():
+                    raise
+                # Deleted since the walk; the source doesn't have it any more either
+        data = read_manifest(partial)
+        data["id"] = dst.name
+        if name is not None:
+            data["name"] = name
+        write_manifest(partial, data)
+        os.rename(partial, dst)
+    except BaseException:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    if progress is not None:
+        progress(total, total)
+    return stats
+
+
+class CloneJob(QObject):
+    # clone_project on a worker thread. Signals arrive on the thread that created the job.
+    progress = Signal(object, object)
+    finished = Signal(object, object)
+    failed = Signal(str)
+
+    def __init__(self, src: Path, dst: Path, name: str | None = None, parent=None):
+        super().__init__(parent)
+        self.src = src
+        self.dst = dst
+        self._name = name
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ProjectClone", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _run(self):
+        try:
+            stats = clone_project(self.src, self.dst, self._name, self.progress.emit, self._cancel)
+        except CloneCancelled:
+            self.failed.emit("")
+            return
+        except (OSError, ValueError) as e:
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(self.dst, stats)
@@ -0,0 +1,216 @@
+import json
+import sys
+from collections import deque
+
+from PySide6.QtCore import QObject, Signal
+
+from layers.L_Model import Layer
+
+
+UNDO_MAX_ENTRIES = 500
+UNDO_MAX_BYTES = 8 * 1024 * 1024
+# Rough per-entry bookkeeping on top of the values it holds
+_ENTRY_OVERHEAD = 200
+
+
+def _attrs_cost(before: dict, after: dict) -> int:
+    return _ENTRY_OVERHEAD + sum(sys.getsizeof(v) for v in (*before.values(), *after.values()))
+
+
+class _SetAttrs:
+    # Only the slots that changed, old and new. Everything else stays on the one shared layer object.
+    __slots__ = ("layer_id", "before", "after", "key", "cost")
+
+    def __init__(self, layer_id, before: dict, after: dict, key):
+        self.layer_id = layer_id
+        self.before = before
+        self.after = after
+        self.key = key
+        self.cost = _attrs_cost(before, after)
+
+    @property
+    def layer_ids(self) -> list:
+        return [self.layer_id]
+
+    def apply(self, layers, forward: bool) -> bool:
+        layer = layers.get(self.layer_id)
+        if layer is None:
+            return False
+        for name, value in (self.after if forward else self.before).items():
+            setattr(layer, name, value)
+        return False
+
+
+class _Structural:
+    # Insert (or remove, when inserted is False) keeps the layer object itself, not a serialised copy
+    __slots__ = ("layer", "index", "inserted", "key", "cost")
+
+    def __init__(self, layer: Layer, index: int, inserted: bool):
+        self.layer = layer
+        self.index = index
+        self.inserted = inserted
+        self.key = None
+        self.cost = _ENTRY_OVERHEAD + len(json.dumps(layer.to_dict(), default=str))
+
+    @property
+    def layer_ids(self) -> list:
+        return [self.layer.id]
+
+    def apply(self, layers, forward: bool) -> bool:
+        if forward == self.inserted:
+            layers.insert(self.layer, self.index)
+        else:
+            layers.remove(self.layer.id)
+        return True
+
+
+class _Group:
+    # Several steps that undo as one (a multi-layer paste)
+    __slots__ = ("entries", "key", "cost")
+
+    def __init__(self, entries: list):
+        self.entries = entries
+        self.key = None
+        self.cost = sum(entry.cost for entry in entries)
+
+    @property
+    def layer_ids(self) -> list:
+        return [i for entry in self.entries for i in entry.layer_ids]
+
+    def apply(self, layers, forward: bool) -> bool:
+        structural = False
+        for entry in (self.entries if forward else reversed(self.entries)):
+            structural |= entry.apply(layers, forward)
+        return structural
+
+
+class History(QObject):
+    # Every layer edit in the editor goes through here: it's applied to the store and recorded as a diff.
+    # The oldest steps fall off once there are more than max_entries or they hold more than max_bytes.
+    changed = Signal()
+
+    def __init__(self, store, max_entries: int = UNDO_MAX_ENTRIES, max_bytes: int = UNDO_MAX_BYTES, parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._undo: deque = deque()
+        self._redo: list = []
+        self._used = 0
+        self._sealed = True
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def __len__(self):
+        return len(self._undo)
+
+    def set_attrs(self, layer_id, attrs: dict, coalesce=None) -> bool:
+        # attrs: slot name -> new value. Returns False when nothing actually changed.
+        # Edits with the same coalesce key fold into one step until seal(), however long the gesture pauses
+        # (a drag is one undo, not 200).
+        layer = self._store.layers.get(layer_id)
+        if layer is None:
+            return False
+        before = {}
+        after = {}
+        for name, value in attrs.items():
+            old = getattr(layer, name)
+            if old != value:
+                before[name] = old
+                after[name] = value
+        if not after:
+            return False
+        with self._store.edit():
+            for name, value in after.items():
+                setattr(layer, name, value)
+            top = self._undo[-1] if self._undo else None
+            if (coalesce is not None and not self._sealed and isinstance(top, _SetAttrs)
+                    and top.key == coalesce and top.layer_id == layer_id):
+                self._merge(top, before, after)
+            else:
+                self._push(_SetAttrs(layer_id, before, after, coalesce))
+        self._sealed = coalesce is None
+        return True
+
+    def insert(self, layer: Layer, index: int | None = None):
+        self.insert_many([layer], index)
+
+    def insert_many(self, new_layers: list[Layer], index: int | None = None):
+        # One undo step however many layers; they land in order, starting at index (default: the top)
+        if not new_layers:
+            return
+        layers = self._store.layers
+        start = len(layers) if index is None else min(index, len(layers))
+        entries = []
+        with self._store.edit():
+            for offset, layer in enumerate(new_layers):
+                layers.insert(layer, start + offset)
+                entries.append(_Structural(layer, start + offset, True))
+            self._push(entries[0] if len(entries) == 1 else _Group(entries))
+        self._sealed = True
+
+    def remove(self, layer_id) -> Layer | None:
+        with self._store.edit():
+            removed = self._store.layers.remove(layer_id)
+            if removed is None:
+                return None
+            self._push(_Structural(*removed, False))
+        self._sealed = True
+        return removed[0]
+
+    def seal(self):
+        # End of a gesture: the next edit starts a new step even if it comes in right away
+        self._sealed = True
+
+    def undo(self) -> tuple | None:
+        # (layer ids, structural) for the step undone, so the caller knows what to repaint
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        self._used -= entry.cost
+        with self._store.edit():
+            structural = entry.apply(self._store.layers, False)
+        self._redo.append(entry)
+        self._sealed = True
+        self.changed.emit()
+        return entry.layer_ids, structural
+
+    def redo(self) -> tuple | None:
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        with self._store.edit():
+            structural = entry.apply(self._store.layers, True)
+        self._undo.append(entry)
+        self._used += entry.cost
+        self._trim()
+        self._sealed = True
+        self.changed.emit()
+        return entry.layer_ids, structural
+
+    def _push(self, entry):
+        self._redo.clear()
+        self._undo.append(entry)
+        self._used += entry.cost
+        self._trim()
+        self.changed.emit()
+
+    def _merge(self, top: _SetAttrs, before: dict, after: dict):
+        self._used -= top.cost
+        for name, value in before.items():
+            top.before.setdefault(name, value)
+        top.after.update(after)
+        top.cost = _attrs_cost(top.before, top.after)
+        self._used += top.cost
+        self._redo.clear()
+        self.changed.emit()
+
+    def _trim(self):
+        while self._undo and (len(self._undo) > self._max_entries or self._used > self._max_bytes):
+            self._used -= self._undo.popleft().cost
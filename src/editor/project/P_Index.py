@@ -0,0 +1,236 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .P_Bundle import BUNDLE_NAME, read_head
+
+INDEX_VERSION = 1
+MANIFEST_NAME = "project.json"
+
+# Below this many stale manifests a thread pool costs more than it saves
+PARALLEL_THRESHOLD = 8
+MAX_WORKERS = 8
+_SUMMARY_KEYS = {"name", "id", "format_version", "editor_version", "resolution"}
+
+
+def _stat_key(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _is_key(key) -> bool:
+    return isinstance(key, list) and len(key) == 2 and all(type(v) is int for v in key)
+
+
+def _is_entry(entry) -> bool:
+    # {"key": [mtime_ns, size], "summary": what read_summary returns}
+    if not isinstance(entry, dict) or not _is_key(entry.get("key")):
+        return False
+    summary = entry.get("summary")
+    return (isinstance(summary, dict) and summary.keys() == _SUMMARY_KEYS
+            and isinstance(summary["resolution"], dict) and summary["resolution"].keys() == {"width", "height"})
+
+
+def manifest_path(project_dir: Path) -> Path:
+    # The bundle when the project has one, otherwise project.json
+    bundle = project_dir / BUNDLE_NAME
+    return bundle if bundle.exists() else project_dir / MANIFEST_NAME
+
+
+def read_summary(project_dir: Path) -> dict | None:
+    # Everything the launcher shows, nothing it doesn't. Layers never make it into the index.
+    path = manifest_path(project_dir)
+    if path.name == BUNDLE_NAME:
+        # Header and head only; the layer records aren't even read
+        data = read_head(path)
+    else:
+        try:
+            data = json.loads(path.read_text())
+        except (json.JSONDecodeError, OSError, UnicodeDecodeError):
+            return None
+    if not isinstance(data, dict):
+        return None
+    res = data.get("resolution")
+    if not isinstance(res, dict):
+        # Hand-edited or damaged; one bad project mustn't take the whole scan down
+        res = {}
+    return {
+        "name": data.get("name", project_dir.name),
+        "id": data.get("id", project_dir.name),
+        "format_version": data.get("format_version", "?"),
+        "editor_version": data.get("editor_version", "?"),
+        "resolution": {
+            "width": res.get("width", "?"),
+            "height": res.get("height", "?"),
+        },
+    }
+
+
+class ProjectIndex:
+
+    def __init__(self, projects_dir: Path, index_path: Path):
+        self._projects_dir = projects_dir
+        self._index_path = index_path
+        self._root_key = None
+        # dir name -> {"key": [mtime_ns, size], "summary": {...}}
+        self._entries: dict[str, dict] = {}
+        # Every subdirectory seen at root_key time, manifest or not (half-copied projects)
+        self._dirs: list[str] = []
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            data = json.loads(self._index_path.read_text())
+        except (json.JSONDecodeError, OSError, UnicodeDecodeError):
+            return
+        if not isinstance(data, dict):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("projects_dir") != str(self._projects_dir):
+            return
+        root_key = data.get("root_key")
+        entries = data.get("entries", {})
+        dirs = data.get("dirs", list(entries) if isinstance(entries, dict) else None)
+        # Same as a decode error when the shape is off: start cold rather than trip over it later
+        if not (root_key is None or _is_key(root_key)):
+            return
+        if not isinstance(entries, dict) or not all(isinstance(name, str) and _is_entry(entry)
+                                                    for name, entry in entries.items()):
+            return
+        if not isinstance(dirs, list) or not all(isinstance(name, str) for name in dirs):
+            return
+        self._root_key = root_key
+        self._entries = entries
+        self._dirs = dirs
+
+    def _save(self):
+        data = {
+            "version": INDEX_VERSION,
+            "projects_dir": str(self._projects_dir),
+            "root_key": self._root_key,
+            "entries": self._entries,
+            "dirs": self._dirs,
+        }
+        try:
+            self._index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._index_path.with_name(self._index_path.name + ".tmp")
+            tmp.write_text(json.dumps(data, separators=(",", ":")))
+            os.replace(tmp, self._index_path)
+        except OSError:
+            pass  # A missing index only costs us a cold scan next time
+
+    def _list_names(self, root_key) -> list[str]:
+        # Directory mtime unchanged means nothing was added, removed or renamed in it
+        if root_key is not None and root_key == self._root_key:
+            return list(self._dirs)
+        names = []
+        try:
+            with os.scandir(self._projects_dir) as it:
+                for entry in it:
+                    # Dot folders are library internals (the shared asset store), not projects
+                    if entry.is_dir() and not entry.name.startswith("."):
+                        names.append(entry.name)
+        except OSError:
+            pass
+        return names
+
+    def _parse(self, stale: list[tuple[str, list]]) -> list[tuple[str, list, dict | None]]:
+        def parse_one(item):
+            name, key = item
+            return name, key, read_summary(self._projects_dir / name)
+
+        if len(stale) < PARALLEL_THRESHOLD:
+            return [parse_one(item) for item in stale]
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(stale))) as pool:
+            return list(pool.map(parse_one, stale))
+
+    def scan(self) -> list[dict]:
+        if not self._projects_dir.exists():
+            self._entries = {}
+            return []
+
+        root_key = _stat_key(str(self._projects_dir))
+        names = self._list_names(root_key)
+
+        entries = {}
+        stale = []
+        for name in names:
+            key = _stat_key(str(manifest_path(self._projects_dir / name)))
+            if key is None:
+                continue
+            cached = self._entries.get(name)
+            if cached and cached["key"] == key:
+                entries[name] = cached
+            else:
+                stale.append((name, key))
+
+        for name, key, summary in self._parse(stale):
+            if summary is not None:
+                entries[name] = {"key": key, "summary": summary}
+
+        changed = bool(stale) or root_key != self._root_key or entries.keys() != self._entries.keys()
+        self._entries = entries
+        self._dirs = names
+        self._root_key = root_key
+        if changed or self._dirty:
+            self._dirty = False
+            self._save()
+        return self.projects()
+
+    def list_dirs(self) -> tuple[set[str], set[str]]:
+        # Names only, no manifests touched: (appeared, vanished) since the last listing
+        old = set(self._dirs)
+        self._root_key = _stat_key(str(self._projects_dir))
+        self._dirs = self._list_names(None)
+        self._dirty = True
+        new = set(self._dirs)
+        return new - old, old - new
+
+    def dirs(self) -> list[str]:
+        return list(self._dirs)
+
+    def refresh(self, project_dir: Path) -> tuple[str | None, dict | None]:
+        # Single-project delta: ("added" | "updated" | "removed" | None, project)
+        name = project_dir.name
+        cached = self._entries.get(name)
+        key = _stat_key(str(manifest_path(project_dir)))
+        if key is not None and cached and cached["key"] == key:
+            return None, self._to_project(name, cached)
+
+        summary = read_summary(self._projects_dir / name) if key is not None else None
+        if summary is None:
+            if cached is None:
+                return None, None
+            del self._entries[name]
+            self._dirty = True
+            return "removed", None
+
+        entry = {"key": key, "summary": summary}
+        self._entries[name] = entry
+        self._dirty = True
+        if cached and cached["summary"] == summary:
+            return None, self._to_project(name, entry)
+        return ("updated" if cached else "added"), self._to_project(name, entry)
+
+    def save(self):
+        if self._dirty:
+            self._dirty = False
+            self._save()
+
+    def get(self, project_dir: Path) -> dict | None:
+        entry = self._entries.get(project_dir.name)
+        if entry is None:
+            return None
+        return self._to_project(project_dir.name, entry)
+
+    def projects(self) -> list[dict]:
+        return [self._to_project(name, self._entries[name]) for name in sorted(self._entries)]
+
+    def _to_project(self, name: str, entry: dict) -> dict:
+        project = dict(entry["summary"])
+        project["path"] = self._projects_dir / name
+        return project
@@ -0,0 +1,172 @@
+import json
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from layers.L_Model import LayerStack
+from timing import trace
+
+from .P_Bundle import BUNDLE_NAME, BUNDLE_FORMAT, JSON_FORMAT, BundleReader, encode_manifest, is_bundle_format
+from .P_Index import MANIFEST_NAME, manifest_path
+
+
+SAVE_DEBOUNCE_MS = 400
+
+
+def _fsync_dir(path: Path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path: Path, data: bytes):
+    # Temp file + fsync + rename: a crash leaves the old file or the new one, never half of each
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def read_manifest(project_path: Path) -> dict:
+    # The whole manifest as a dict, whichever format it's stored in
+    path = manifest_path(project_path)
+    if path.name == BUNDLE_NAME:
+        return BundleReader(path).manifest()
+    return json.loads(path.read_text())
+
+
+def write_manifest(project_path: Path, manifest: dict):
+    if is_bundle_format(manifest.get("format_version")):
+        write_atomic(project_path / BUNDLE_NAME, encode_manifest(manifest))
+    else:
+        write_atomic(project_path / MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+
+
+class ProjectStore(QObject):
+    # Emitted on the UI thread with the error text when a background save fails
+    save_failed = Signal(str)
+
+    def __init__(self, project_path: Path, parent=None):
+        super().__init__(parent)
+        self.path = project_path
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._saved_generation = 0
+
+        self.layers = None
+        path = manifest_path(project_path)
+        try:
+            if path.name == BUNDLE_NAME:
+                bundle = BundleReader(path)
+                self.data = bundle.head
+                self.layers = LayerStack.from_bundle(bundle)
+            else:
+                self.data = json.loads(path.read_text())
+            self._broken = not isinstance(self.data, dict)
+        except (json.JSONDecodeError, OSError, UnicodeDecodeError, ValueError, struct.error):
+            self._broken = True
+        if self._broken:
+            # Never write an empty manifest over one we couldn't read
+            self.data = {"layers": []}
+            self.layers = None
+        # Layers live as typed objects; data["layers"] only keeps its spot in the key order
+        if self.layers is None:
+            self.layers = LayerStack.from_manifest(self.data.get("layers") or [])
+        self.data["layers"] = None
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ProjectStore")
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SAVE_DEBOUNCE_MS)
+        self._timer.timeout.connect(self._write_behind)
+
+    @property
+    def dirty(self) -> bool:
+        return self._generation != self._saved_generation
+
+    @property
+    def is_bundle(self) -> bool:
+        return is_bundle_format(self.data.get("format_version"))
+
+    def set_bundle(self, enabled: bool) -> bool:
+        # Switch between project.json and the compact bundle; same content either way
+        if enabled == self.is_bundle:
+            return True
+        with self.edit():
+            self.data["format_version"] = BUNDLE_FORMAT if enabled else JSON_FORMAT
+        if not self.flush():
+            return False
+        try:
+            (self.path / (MANIFEST_NAME if enabled else BUNDLE_NAME)).unlink(missing_ok=True)
+        except OSError:
+            pass
+        return True
+
+    def to_manifest(self) -> dict:
+        return {k: (self.layers.to_manifest() if k == "layers" else v) for k, v in self.data.items()}
+
+    @contextmanager
+    def edit(self):
+        # Mutations hold the lock so the writer never serialises a half-applied edit
+        with self._lock:
+            yield self
+            self._generation += 1
+        self._timer.start()
+
+    def mark_dirty(self):
+        with self._lock:
+            self._generation += 1
+        self._timer.start()
+
+    def _write_behind(self):
+        if self.dirty and not self._broken:
+            self._executor.submit(self._write)
+
+    def _write(self) -> bool:
+        with self._lock:
+            generation = self._generation
+            if generation == self._saved_generation:
+                return True
+            with trace.span("save.serialize", "io"):
+                if self.is_bundle:
+                    name = BUNDLE_NAME
+                    payload = encode_manifest(self.to_manifest())
+                else:
+                    name = MANIFEST_NAME
+                    payload = json.dumps(self.to_manifest(), indent=2).encode()
+        try:
+            with trace.span("save.write", "io"):
+                write_atomic(self.path / name, payload)
+        except OSError as e:
+            self.save_failed.emit(str(e))
+            return False
+        with self._lock:
+            self._saved_generation = max(self._saved_generation, generation)
+        return True
+
+    def flush(self) -> bool:
+        # Explicit save: skip the debounce and wait for the disk
+        self._timer.stop()
+        if self._broken:
+            return False
+        future = self._executor.submit(self._write)
+        return future.result()
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
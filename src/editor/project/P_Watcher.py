@@ -0,0 +1,98 @@
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+from .P_Index import ProjectIndex, manifest_path
+
+
+# Bulk copies fire hundreds of events; wait for them to settle before touching anything
+COALESCE_MS = 200
+
+
+class ProjectWatcher(QObject):
+    added = Signal(object)
+    updated = Signal(object)
+    removed = Signal(object)
+    # Anything inside a project dir changed (preview included), manifest or not
+    touched = Signal(object)
+
+    def __init__(self, index: ProjectIndex, projects_dir: Path, parent=None):
+        super().__init__(parent)
+        self._index = index
+        self._projects_dir = projects_dir
+        self._root_dirty = False
+        self._dirty: set[str] = set()
+
+        self._fs = QFileSystemWatcher(self)
+        self._fs.directoryChanged.connect(self._on_directory_changed)
+        # In-place manifest writes don't show up as directory changes
+        self._fs.fileChanged.connect(self._on_file_changed)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(COALESCE_MS)
+        self._timer.timeout.connect(self._flush)
+
+    def start(self):
+        paths = [str(self._projects_dir)]
+        for name in self._index.dirs():
+            paths += self._project_paths(name)
+        self._fs.addPaths(paths)
+
+    def _project_paths(self, name: str) -> list[str]:
+        project_dir = self._projects_dir / name
+        paths = [str(project_dir)]
+        manifest = manifest_path(project_dir)
+        if manifest.exists():
+            paths.append(str(manifest))
+        return paths
+
+    def _watch(self, names):
+        watched = set(self._fs.files()) | set(self._fs.directories())
+        paths = [p for name in names for p in self._project_paths(name) if p not in watched]
+        if paths:
+            self._fs.addPaths(paths)
+
+    def refresh(self, project_dir: Path):
+        # For changes we made ourselves: apply right away instead of waiting on the event
+        if self._apply(project_dir.name) in ("added", "updated"):
+            self._watch([project_dir.name])
+        self._index.save()
+
+    def _on_directory_changed(self, path: str):
+        path = Path(path)
+        if path == self._projects_dir:
+            self._root_dirty = True
+        elif path.parent == self._projects_dir:
+            self._dirty.add(path.name)
+        self._timer.start()
+
+    def _on_file_changed(self, path: str):
+        self._dirty.add(Path(path).parent.name)
+        self._timer.start()
+
+    def _flush(self):
+        dirty, self._dirty = self._dirty, set()
+        if self._root_dirty:
+            self._root_dirty = False
+            appeared, vanished = self._index.list_dirs()
+            dirty |= appeared | vanished
+
+        for name in sorted(dirty):
+            self._apply(name)
+        # Atomic saves swap the manifest inode out from under the watch, so re-arm it
+        self._watch([name for name in dirty if (self._projects_dir / name).is_dir()])
+        self._index.save()
+
+    def _apply(self, name: str) -> str | None:
+        project_dir = self._projects_dir / name
+        kind, project = self._index.refresh(project_dir)
+        if kind == "added":
+            self.added.emit(project)
+        elif kind == "updated":
+            self.updated.emit(project)
+        elif kind == "removed":
+            self.removed.emit(project_dir)
+        if kind != "removed" and project is not None:
+            self.touched.emit(project_dir)
+        return kind
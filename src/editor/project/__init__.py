@@ -0,0 +1,8 @@
+from .P_Index import ProjectIndex, read_summary, manifest_path, MANIFEST_NAME
+from .P_Watcher import ProjectWatcher
+from .P_Store import ProjectStore, read_manifest, write_manifest, write_atomic
+from .P_Bundle import BundleReader, encode_manifest, is_bundle_format, BUNDLE_NAME, BUNDLE_FORMAT, JSON_FORMAT
+from .P_Assets import AssetStore, assets_for, sweep_library, ASSETS_DIR, SWEEP_GRACE_S
+from .P_Canvas import TiledCanvas, create_canvas, is_tiled, CANVAS_DIR, TILE_SIZE
+from .P_Clone import CloneJob, clone_project, clone_file, generate_project_id, new_project_dir
+from .P_History import History, UNDO_MAX_ENTRIES, UNDO_MAX_BYTES
@@ -0,0 +1,277 @@
+import math
+import struct
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+FFT_SIZE = 1024
+# One analysis per hop: 512 samples is ~94 updates/s at 48 kHz, ~86 at 44.1 kHz
+HOP = 512
+BANDS = 8
+BAND_LOW_HZ = 40.0
+BAND_HIGH_HZ = 16000.0
+# Onsets: flux has to beat its running mean by this many deviations, at most one per refractory window
+ONSET_SENSITIVITY = 1.5
+ONSET_REFRACTORY_S = 0.1
+FLUX_SMOOTHING = 0.05
+
+
+class _PacedSource:
+    rate = 48000
+    _block = HOP
+    _next_due = None
+
+    def _pace(self):
+        # Hand blocks out at the speed they'd play at, like a live source would
+        now = time.perf_counter()
+        if self._next_due is None:
+            self._next_due = now
+        self._next_due += self._block / self.rate
+        if self._next_due > now:
+            time.sleep(self._next_due - now)
+        elif now - self._next_due > 0.5:
+            self._next_due = now
+
+    def close(self):
+        pass
+
+
+class WavSource(_PacedSource):
+    # 16-bit PCM WAV, mixed to mono, paced to real time and looped. Reads straight into
+    # preallocated buffers. The int16 -> float cast is done contiguous into _wide; a strided or reducing
+    # cast (np.mean over the channel axis) would make numpy allocate a cast buffer every block.
+
+    def __init__(self, path: Path, block: int = HOP):
+        self._f = open(path, "rb")
+        self.rate, self.channels, self._data_start, self._data_len = _read_wav_header(self._f)
+        self._block = block
+        self._raw = bytearray(block * self.channels * 2)
+        self._raw_view = memoryview(self._raw)
+        self._pcm = np.frombuffer(self._raw, dtype="<i2").reshape(block, self.channels)
+        self._wide = np.empty((block, self.channels), dtype=np.float64)
+        self._scale = 1.0 / (32768.0 * self.channels)
+        self._pos = 0
+        self._f.seek(self._data_start)
+
+    def read_into(self, out: np.ndarray):
+        need = len(self._raw)
+        got = 0
+        while got < need:
+            left = self._data_len - self._pos
+            if left <= 0:
+                self._f.seek(self._data_start)
+                self._pos = 0
+                left = self._data_len
+            n = self._f.readinto(self._raw_view[got:got + min(need - got, left)])
+            if not n:
+                # Truncated file: the rest of this block is silence, the next one starts over from the top
+                self._raw_view[got:] = bytes(need - got)
+                self._pos = self._data_len
+                break
+            got += n
+            self._pos += n
+        np.copyto(self._wide, self._pcm)
+        np.copyto(out, self._wide[:, 0])
+        for c in range(1, self.channels):
+            np.add(out, self._wide[:, c], out=out)
+        np.multiply(out, self._scale, out=out)
+        self._pace()
+
+    def close(self):
+        self._f.close()
+
+
+class ToneSource(_PacedSource):
+    # Stand-in for a PipeWire capture until there's a real one: a low tone with a kick every half second
+
+    def __init__(self, rate: int = 48000, block: int = HOP, bpm: float = 120.0):
+        self.rate = rate
+        self.channels = 1
+        self._block = block
+        self._t = np.arange(block, dtype=np.float64)
+        self._phase = np.empty(block, dtype=np.float64)
+        self._env = np.empty(block, dtype=np.float64)
+        self._sample = 0
+        self._beat_len = int(rate * 60.0 / bpm)
+
+    def read_into(self, out: np.ndarray):
+        # Kick: decaying 60 Hz burst at each beat; plus a quiet 220 Hz bed
+        np.add(self._t, self._sample, out=self._phase)
+        np.mod(self._phase, self._beat_len, out=self._env)
+        np.multiply(self._env, -30.0 / self.rate, out=self._env)
+        np.exp(self._env, out=self._env)
+        np.multiply(self._phase, 2 * math.pi * 60.0 / self.rate, out=self._phase)
+        np.sin(self._phase, out=self._phase)
+        np.multiply(self._phase, self._env, out=self._env)
+        np.add(self._t, self._sample, out=self._phase)
+        np.multiply(self._phase, 2 * math.pi * 220.0 / self.rate, out=self._phase)
+        np.sin(self._phase, out=self._phase)
+        np.multiply(self._phase, 0.1, out=self._phase)
+        np.add(self._env, self._phase, out=self._env)
+        np.multiply(self._env, 0.8, out=out)
+        self._sample += self._block
+        self._pace()
+
+
+def _read_exact(f, n: int) -> bytes:
+    data = f.read(n)
+    if len(data) < n:
+        raise ValueError("WAV file is truncated")
+    return data
+
+
+def _read_wav_header(f) -> tuple[int, int, int, int]:
+    # (rate, channels, data offset, data length) for 16-bit PCM; anything else is refused
+    riff, _, wave = struct.unpack("<4sI4s", _read_exact(f, 12))
+    if riff != b"RIFF" or wave != b"WAVE":
+        raise ValueError("not a WAV file")
+    fmt = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("WAV file has no data chunk")
+        chunk_id, size = struct.unpack("<4sI", header)
+        if chunk_id == b"fmt ":
+            if size < 16:
+                raise ValueError("WAV fmt chunk is too short")
+            fmt = struct.unpack("<HHIIHH", _read_exact(f, 16))
+            f.seek(size - 16 + (size & 1), 1)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data before fmt chunk")
+            audio_format, channels, rate, _, _, bits = fmt
+            if audio_format != 1 or bits != 16:
+                raise ValueError("only 16-bit PCM WAV is supported")
+            if not channels or not rate:
+                raise ValueError("WAV file has no channels or no sample rate")
+            # Whole frames only; with none at all there'd be nothing to loop over
+            size -= size % (channels * 2)
+            if not size:
+                raise ValueError("WAV file has no audio")
+            return rate, channels, f.tell(), size
+        else:
+            f.seek(size + (size & 1), 1)
+
+
+def check_wav(path: Path):
+    # Raises OSError/ValueError if WavSource couldn't play path; for checking a file before it's used
+    with open(path, "rb") as f:
+        _read_wav_header(f)
+
+
+class AudioAnalyzer:
+    # Worker thread: slide a FFT_SIZE window along the PCM by HOP samples, then windowed FFT,
+    # log-spaced band energies and spectral-flux onsets. Every buffer is allocated up front; the
+    # loop only writes into them. Readers take a copy of the latest values under a short lock.
+    # float64 throughout: rfft computes in double anyway, so float32 buffers would only add a cast copy.
+
+    def __init__(self, source):
+        self._source = source
+        rate = source.rate
+        self._window = np.hanning(FFT_SIZE).astype(np.float64)
+        # Every hop lands twice, FFT_SIZE apart, so the current window is always one contiguous slice
+        self._ring = np.zeros(2 * FFT_SIZE, dtype=np.float64)
+        self._ring_pos = 0
+        self._block = np.zeros(HOP, dtype=np.float64)
+        self._windowed = np.zeros(FFT_SIZE, dtype=np.float64)
+        self._spectrum = np.zeros(FFT_SIZE // 2 + 1, dtype=np.complex128)
+        self._mag = np.zeros(FFT_SIZE // 2 + 1, dtype=np.float64)
+        self._prev_mag = np.zeros_like(self._mag)
+        self._diff = np.zeros_like(self._mag)
+        self._band_sums = np.zeros(BANDS + 1, dtype=np.float64)
+        self._band_edges = _band_edges(rate)
+        self._band_widths = np.diff(np.append(self._band_edges, len(self._mag))).astype(np.float64)
+
+        self._lock = threading.Lock()
+        self._bands = np.zeros(BANDS, dtype=np.float64)
+        self._level = 0.0
+        self._flux = 0.0
+        self._beat_at = 0.0
+        self.generation = 0
+
+        self._flux_mean = 0.0
+        self._flux_var = 0.0
+        self._last_onset = -1.0
+        self._clock = 0.0
+        self._hop_s = HOP / rate
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="AudioAnalyzer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._source.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._source.read_into(self._block)
+            self._analyze()
+
+    def _analyze(self):
+        pos = self._ring_pos
+        self._ring[pos:pos + HOP] = self._block
+        self._ring[pos + FFT_SIZE:pos + FFT_SIZE + HOP] = self._block
+        pos = self._ring_pos = (pos + HOP) % FFT_SIZE
+        np.multiply(self._ring[pos:pos + FFT_SIZE], self._window, out=self._windowed)
+        # out= needs NumPy 2.0 (see the README); older versions would allocate a spectrum every hop
+        np.fft.rfft(self._windowed, out=self._spectrum)
+        np.abs(self._spectrum, out=self._mag)
+        np.multiply(self._mag, 2.0 / FFT_SIZE, out=self._mag)
+
+        # Band energies: mean magnitude per band
+        np.add.reduceat(self._mag, self._band_edges, out=self._band_sums[:BANDS])
+        np.divide(self._band_sums[:BANDS], self._band_widths, out=self._band_sums[:BANDS])
+
+        # Spectral flux: how much louder each bin got since the last hop
+        np.subtract(self._mag, self._prev_mag, out=self._diff)
+        np.maximum(self._diff, 0.0, out=self._diff)
+        flux = float(self._diff.sum())
+        self._prev_mag[:] = self._mag
+        level = float(np.sqrt(np.dot(self._block, self._block) / HOP))
+
+        self._clock += self._hop_s
+        deviation = math.sqrt(self._flux_var)
+        onset = (flux > self._flux_mean + ONSET_SENSITIVITY * deviation and flux > 1e-4
+                 and self._clock - self._last_onset >= ONSET_REFRACTORY_S)
+        if onset:
+            self._last_onset = self._clock
+        delta = flux - self._flux_mean
+        self._flux_mean += FLUX_SMOOTHING * delta
+        self._flux_var = (1 - FLUX_SMOOTHING) * (self._flux_var + FLUX_SMOOTHING * delta * delta)
+
+        with self._lock:
+            self._bands[:] = self._band_sums[:BANDS]
+            self._level = level
+            self._flux = flux
+            if onset:
+                self._beat_at = time.perf_counter()
+            self.generation += 1
+
+    def read(self, bands_out: np.ndarray) -> tuple[float, float, float]:
+        # Copies the band energies into bands_out; returns (level, flux, seconds since the last beat)
+        with self._lock:
+            bands_out[:] = self._bands
+            level, flux, beat_at = self._level, self._flux, self._beat_at
+        return level, flux, (time.perf_counter() - beat_at) if beat_at else math.inf
+
+
+def _band_edges(rate: int) -> np.ndarray:
+    # Log-spaced bin indices from BAND_LOW_HZ to BAND_HIGH_HZ (clamped to Nyquist), strictly increasing
+    nyquist = rate / 2
+    high = min(BAND_HIGH_HZ, nyquist)
+    hz = np.geomspace(BAND_LOW_HZ, high, BANDS + 1)[:-1]
+    bins = np.floor(hz / nyquist * (FFT_SIZE // 2)).astype(np.intp)
+    for i in range(1, len(bins)):
+        bins[i] = max(bins[i], bins[i - 1] + 1)
+    return bins
+
+
+def open_source(path: Path | None):
+    # A WAV file when there is one, otherwise the stand-in live source
+    return WavSource(path) if path is not None else ToneSource()
@@ -0,0 +1,191 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+from PySide6.QtGui import QImage, QColor
+from PySide6.QtCore import Qt
+
+from layers.L_Model import LayerStack, Layer, RectLayer
+from project.P_Canvas import TiledCanvas, is_tiled
+from project.P_Assets import assets_for
+from project.P_Store import read_manifest
+
+
+# Usage (from src/editor):
+#   python -m render <project_dir>... [--size 1920x1080] [--out DIR]
+# Works without a display; it forces the offscreen platform when run like this.
+
+
+def _premultiplied(color: str) -> np.ndarray:
+    c = QColor(color)
+    a = c.alphaF()
+    return np.array([c.redF() * a, c.greenF() * a, c.blueF() * a, a], dtype=np.float32)
+
+
+def qimage_to_premultiplied(img: QImage, width: int, height: int) -> np.ndarray:
+    # HxWx4 float32 premultiplied RGBA, scaled to the target size
+    if img.width() != width or img.height() != height:
+        img = img.scaled(width, height, Qt.AspectRatioMode.IgnoreAspectRatio,
+                         Qt.TransformationMode.SmoothTransformation)
+    img = img.convertToFormat(QImage.Format.Format_RGBA8888_Premultiplied)
+    arr = np.frombuffer(img.constBits(), dtype=np.uint8, count=img.sizeInBytes())
+    arr = arr.reshape(height, img.bytesPerLine())[:, :width * 4].reshape(height, width, 4)
+    return arr.astype(np.float32) * (1.0 / 255.0)
+
+
+def blend_over(dst: np.ndarray, src: np.ndarray):
+    # Porter-Duff "over" on premultiplied buffers, in place: dst = src + dst * (1 - src.a)
+    dst *= 1.0 - src[..., 3:4]
+    dst += src
+
+
+class Compositor:
+
+    def __init__(self, project_path: Path, layers: LayerStack, canvas_w: int, canvas_h: int):
+        self._project_path = project_path
+        self._layers = layers
+        # Canvas size in project pixels; render() can draw it at any other size
+        self.width = canvas_w
+        self.height = canvas_h
+        # type -> fn(self, buf, layer, sx, sy); image layers and friends register here
+        self._renderers = {
+            "solid_color": Compositor._draw_solid,
+            "image": Compositor._draw_image,
+        }
+        self._assets = assets_for(project_path)
+
+    @classmethod
+    def from_project(cls, project_path: Path) -> "Compositor":
+        data = read_manifest(project_path)
+        res = data.get("resolution", {})
+        layers = LayerStack.from_manifest(data.get("layers") or [])
+        return cls(project_path, layers, res.get("width", 1920), res.get("height", 1080))
+
+    def render(self, width: int, height: int) -> np.ndarray:
+        # HxWx4 uint8, straight (non-premultiplied) RGBA
+        buf = np.zeros((height, width, 4), dtype=np.float32)
+        sx = width / self.width
+        sy = height / self.height
+
+        # Same order as CanvasView: canvas image at the bottom, then the stack bottom to top
+        for layer in self._layers:
+            if layer.is_canvas and layer.is_visible:
+                self._draw_canvas(buf, layer, sx, sy)
+        for layer in self._layers:
+            if layer.is_canvas or not layer.is_visible:
+                continue
+            draw = self._renderers.get(layer.type)
+            if draw is not None:
+                draw(self, buf, layer, sx, sy)
+
+        return self._to_straight_u8(buf)
+
+    def _pixel_rect(self, layer: RectLayer, sx: float, sy: float, width: int, height: int):
+        x, y, w, h = layer.bounds(self.width, self.height)
+        x0 = min(max(round(x * sx), 0), width)
+        y0 = min(max(round(y * sy), 0), height)
+        x1 = min(max(round((x + w) * sx), 0), width)
+        y1 = min(max(round((y + h) * sy), 0), height)
+        return x0, y0, x1, y1
+
+    def _draw_canvas(self, buf: np.ndarray, layer: Layer, sx: float, sy: float):
+        source = self._project_path / (layer.source or "canvas.png")
+        if is_tiled(source):
+            self._draw_tiles(buf, TiledCanvas(source, self.width, self.height, layer.tile_size), sx, sy)
+            return
+        img = QImage(str(source))
+        if img.isNull():
+            return
+        height, width = buf.shape[:2]
+        blend_over(buf, qimage_to_premultiplied(img, width, height))
+
+    def _draw_tiles(self, buf: np.ndarray, tiles: TiledCanvas, sx: float, sy: float):
+        height, width = buf.shape[:2]
+        for tx, ty in tiles.tiles_in(0, 0, tiles.width, tiles.height):
+            img = tiles.load(tx, ty)
+            if img is None:
+                continue
+            x, y, w, h = tiles.tile_rect(tx, ty)
+            x0, y0 = min(round(x * sx), width), min(round(y * sy), height)
+            x1, y1 = min(round((x + w) * sx), width), min(round((y + h) * sy), height)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            blend_over(buf[y0:y1, x0:x1], qimage_to_premultiplied(img, x1 - x0, y1 - y0))
+
+    def _draw_image(self, buf: np.ndarray, layer, sx: float, sy: float):
+        # Scale the whole asset into the layer's rect, then blend the part that lands on the buffer
+        if not layer.asset:
+            return
+        img = self._assets.image(layer.asset)
+        if img is None:
+            return
+        x, y, w, h = layer.bounds(self.width, self.height)
+        px0, py0 = round(x * sx), round(y * sy)
+        pw, ph = round((x + w) * sx) - px0, round((y + h) * sy) - py0
+        x0, y0, x1, y1 = self._pixel_rect(layer, sx, sy, buf.shape[1], buf.shape[0])
+        if pw <= 0 or ph <= 0 or x0 >= x1 or y0 >= y1:
+            return
+        src = qimage_to_premultiplied(img, pw, ph)
+        blend_over(buf[y0:y1, x0:x1], src[y0 - py0:y1 - py0, x0 - px0:x1 - px0])
+
+    def _draw_solid(self, buf: np.ndarray, layer, sx: float, sy: float):
+        x0, y0, x1, y1 = self._pixel_rect(layer, sx, sy, buf.shape[1], buf.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+        color = _premultiplied(layer.fill)
+        region = buf[y0:y1, x0:x1]
+        region *= 1.0 - color[3]
+        region += color
+
+    @staticmethod
+    def _to_straight_u8(buf: np.ndarray) -> np.ndarray:
+        alpha = buf[..., 3:4]
+        rgb = np.divide(buf[..., :3], alpha, out=np.zeros_like(buf[..., :3]), where=alpha > 0)
+        out = np.empty(buf.shape, dtype=np.uint8)
+        np.clip(rgb * 255.0 + 0.5, 0, 255, out=rgb)
+        out[..., :3] = rgb
+        out[..., 3:4] = np.clip(alpha * 255.0 + 0.5, 0, 255)
+        return out
+
+
+def to_qimage(rgba: np.ndarray) -> QImage:
+    height, width = rgba.shape[:2]
+    rgba = np.ascontiguousarray(rgba)
+    return QImage(rgba.data, width, height, width * 4, QImage.Format.Format_RGBA8888).copy()
+
+
+def render_project(project_path: Path, width: int | None = None, height: int | None = None) -> np.ndarray:
+    comp = Compositor.from_project(project_path)
+    return comp.render(width or comp.width, height or comp.height)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Render AWE projects to PNG without a display.")
+    parser.add_argument("projects", nargs="+", type=Path)
+    parser.add_argument("--size", help="WxH, defaults to each project's resolution")
+    parser.add_argument("--out", type=Path, default=Path("."), help="output directory")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtGui import QGuiApplication
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+
+    width = height = None
+    if args.size:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    failed = 0
+    for project in args.projects:
+        try:
+            rgba = render_project(project, width, height)
+        except (OSError, ValueError) as e:
+            print(f"{project}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        out = args.out / f"{project.name}.png"
+        to_qimage(rgba).save(str(out))
+        print(out)
+    return 1 if failed else 0
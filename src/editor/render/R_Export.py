@@ -0,0 +1,328 @@
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+from pathlib import Path
+
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtCore import QObject, QRect, QRectF, Qt, Signal
+
+from layers.L_Model import LayerStack, RectLayer, ImageLayer, SolidColorLayer
+from project.P_Canvas import TiledCanvas, is_tiled, TILE_SIZE
+from project.P_Assets import assets_for
+from project.P_Store import read_manifest
+
+
+# Usage (from src/editor):
+#   python -m render export <project_dir> --out DIR
+# Writes DIR/layout.json plus a handful of textures: atlas pages for the small image layers, one file per
+# big one, and the canvas. Everything is already at the size it's drawn at for the project's resolution.
+LAYOUT_NAME = "layout.json"
+LAYOUT_VERSION = 1
+ATLAS_PAGE_MAX = 2048
+# Images bigger than this on either side get a texture of their own instead of eating an atlas page
+ATLAS_MAX_SIDE = 512
+# Edge pixels are repeated into the gap so linear filtering never samples a neighbour
+ATLAS_PADDING = 2
+
+
+class _Skyline:
+    # Bottom-left skyline packer: the top edge of everything placed so far, as (x, y, width) segments
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self._nodes = [(0, 0, width)]
+        self.used_w = 0
+        self.used_h = 0
+
+    def insert(self, w: int, h: int) -> tuple[int, int] | None:
+        best = None
+        for i, (x, _, _) in enumerate(self._nodes):
+            y = self._fit(i, w, h)
+            if y is not None and (best is None or (y + h, x) < (best[1] + h, best[0])):
+                best = (x, y, i)
+        if best is None:
+            return None
+        x, y, i = best
+        self._place(i, x, y, w, h)
+        self.used_w = max(self.used_w, x + w)
+        self.used_h = max(self.used_h, y + h)
+        return x, y
+
+    def _fit(self, i: int, w: int, h: int) -> int | None:
+        # Lowest y a w x h box can sit at with its left edge on node i
+        x = self._nodes[i][0]
+        if x + w > self.width:
+            return None
+        y = 0
+        left = w
+        while left > 0:
+            _, ny, nw = self._nodes[i]
+            y = max(y, ny)
+            if y + h > self.height:
+                return None
+            left -= nw
+            i += 1
+        return y
+
+    def _place(self, i: int, x: int, y: int, w: int, h: int):
+        nodes = self._nodes
+        nodes.insert(i, (x, y + h, w))
+        end = x + w
+        j = i + 1
+        while j < len(nodes):
+            nx, ny, nw = nodes[j]
+            if nx >= end:
+                break
+            if nx + nw <= end:
+                del nodes[j]
+                continue
+            nodes[j] = (end, ny, nx + nw - end)
+            break
+        k = 0
+        while k < len(nodes) - 1:
+            if nodes[k][1] == nodes[k + 1][1]:
+                nodes[k] = (nodes[k][0], nodes[k][1], nodes[k][2] + nodes[k + 1][2])
+                del nodes[k + 1]
+            else:
+                k += 1
+
+
+def _pow2(n: int) -> int:
+    return 1 << max(0, math.ceil(math.log2(max(n, 1))))
+
+
+def _floor_pow2(n: int) -> int:
+    return 1 << max(0, max(n, 1).bit_length() - 1)
+
+
+def _page_size(text: str) -> int:
+    n = int(text)
+    if n <= 0 or n & (n - 1):
+        raise argparse.ArgumentTypeError(f"{text} isn't a power of two")
+    return n
+
+
+def _blit_padded(painter: QPainter, img: QImage, x: int, y: int, pad: int):
+    w, h = img.width(), img.height()
+    painter.drawImage(x, y, img)
+    if not pad:
+        return
+    painter.drawImage(QRect(x - pad, y, pad, h), img, QRect(0, 0, 1, h))
+    painter.drawImage(QRect(x + w, y, pad, h), img, QRect(w - 1, 0, 1, h))
+    painter.drawImage(QRect(x, y - pad, w, pad), img, QRect(0, 0, w, 1))
+    painter.drawImage(QRect(x, y + h, w, pad), img, QRect(0, h - 1, w, 1))
+    for cx, cy, sx, sy in ((x - pad, y - pad, 0, 0), (x + w, y - pad, w - 1, 0),
+                           (x - pad, y + h, 0, h - 1), (x + w, y + h, w - 1, h - 1)):
+        painter.drawImage(QRect(cx, cy, pad, pad), img, QRect(sx, sy, 1, 1))
+
+
+def pack(sizes: list[tuple[int, int]], page_max: int = ATLAS_PAGE_MAX,
+         padding: int = ATLAS_PADDING) -> tuple[list[tuple[int, int]], list[tuple[int, int, int]]]:
+    # -> (power-of-two page sizes, (page, x, y) per input size). Tallest first packs tightest.
+    # page_max is rounded down to a power of two, so cutting a page down never takes it past page_max.
+    page_max = _floor_pow2(page_max)
+    pages: list[_Skyline] = []
+    placed = [None] * len(sizes)
+    order = sorted(range(len(sizes)), key=lambda i: (sizes[i][1], sizes[i][0]), reverse=True)
+    for i in order:
+        w, h = sizes[i][0] + 2 * padding, sizes[i][1] + 2 * padding
+        for page_index, page in enumerate(pages):
+            spot = page.insert(w, h)
+            if spot is not None:
+                break
+        else:
+            page_index = len(pages)
+            pages.append(_Skyline(page_max, page_max))
+            spot = pages[-1].insert(w, h)
+        placed[i] = (page_index, spot[0] + padding, spot[1] + padding)
+    # Packed against the full page, then cut down to the smallest power of two that holds it
+    return [(_pow2(p.used_w), _pow2(p.used_h)) for p in pages], placed
+
+
+def _render_canvas(project_path: Path, layer, width: int, height: int) -> QImage | None:
+    source = project_path / (layer.source or "canvas.png")
+    if is_tiled(source):
+        tiles = TiledCanvas(source, width, height, layer.tile_size)
+        if not tiles.stored:
+            return None
+        out = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+        out.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(out)
+        for tx, ty in tiles.tiles_in(0, 0, width, height):
+            img = tiles.load(tx, ty)
+            if img is not None:
+                x, y, _, _ = tiles.tile_rect(tx, ty)
+                painter.drawImage(x, y, img)
+        painter.end()
+        return out
+    img = QImage(str(source))
+    if img.isNull():
+        return None
+    if img.width() == width and img.height() == height:
+        return img
+    # Old canvas.png at another size: scaled into the output a tile at a time, like the tiled path draws,
+    # so there's never a second full-size scaled copy next to the output
+    out = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    out.fill(Qt.GlobalColor.transparent)
+    sx, sy = img.width() / width, img.height() / height
+    painter = QPainter(out)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+    painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+    for y in range(0, height, TILE_SIZE):
+        for x in range(0, width, TILE_SIZE):
+            w, h = min(TILE_SIZE, width - x), min(TILE_SIZE, height - y)
+            painter.drawImage(QRectF(x, y, w, h), img, QRectF(x * sx, y * sy, w * sx, h * sy))
+    painter.end()
+    return out
+
+
+def export_project(project_path: Path, out_dir: Path, page_max: int = ATLAS_PAGE_MAX,
+                   padding: int = ATLAS_PADDING) -> tuple[dict, list[str]]:
+    # -> (the layout that was written, names of layers that couldn't be exported)
+    page_max = _floor_pow2(page_max)
+    data = read_manifest(project_path)
+    res = data.get("resolution", {})
+    width, height = res.get("width", 1920), res.get("height", 1080)
+    layers = LayerStack.from_manifest(data.get("layers") or [])
+    assets = assets_for(project_path)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    textures = []
+    entries = []
+    skipped = []
+    # (asset, w, h) -> scaled image; layers showing the same asset at the same size share one slot
+    scaled: dict[tuple, QImage] = {}
+
+    def add_texture(name: str, img: QImage) -> int:
+        img.save(str(out_dir / name), "PNG")
+        textures.append({"file": name, "width": img.width(), "height": img.height()})
+        return len(textures) - 1
+
+    for layer in layers:
+        if layer.is_canvas:
+            if not layer.is_visible:
+                continue
+            img = _render_canvas(project_path, layer, width, height)
+            if img is not None:
+                tex = add_texture("canvas.png", img)
+                entries.append({"type": "image", "rect": [0, 0, width, height], "texture": tex,
+                                "uv": [0, 0, width, height]})
+            continue
+        if not layer.is_visible:
+            continue
+        if not isinstance(layer, RectLayer):
+            # Unknown types load as GenericLayer: no geometry to place them with
+            skipped.append(layer.display_name)
+            continue
+        x, y, w, h = layer.bounds(width, height)
+        rect = [x, y, w, h]
+        if isinstance(layer, SolidColorLayer):
+            entries.append({"type": "solid_color", "rect": rect, "color": layer.fill})
+        elif isinstance(layer, ImageLayer) and layer.asset:
+            key = (layer.asset, round(w), round(h))
+            if key not in scaled:
+                img = assets.image(layer.asset)
+                if img is None or key[1] <= 0 or key[2] <= 0:
+                    skipped.append(layer.display_name)
+                    continue
+                scaled[key] = img.scaled(key[1], key[2], Qt.AspectRatioMode.IgnoreAspectRatio,
+                                         Qt.TransformationMode.SmoothTransformation)
+            # Texture and uv get filled in once the atlas is packed
+            entries.append({"type": "image", "rect": rect, "key": key})
+        else:
+            # Video and audio layers have no runtime counterpart yet
+            skipped.append(layer.display_name)
+
+    fits = min(ATLAS_MAX_SIDE, page_max - 2 * padding)
+    small = [key for key in scaled if key[1] <= fits and key[2] <= fits]
+    where = {}
+    if small:
+        page_sizes, placed = pack([(key[1], key[2]) for key in small], page_max, padding)
+        pages = []
+        for page_w, page_h in page_sizes:
+            page = QImage(page_w, page_h, QImage.Format.Format_ARGB32_Premultiplied)
+            page.fill(Qt.GlobalColor.transparent)
+            pages.append(page)
+        painters = [QPainter(page) for page in pages]
+        for painter in painters:
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        for key, (page_index, px, py) in zip(small, placed):
+            _blit_padded(painters[page_index], scaled[key], px, py, padding)
+        for painter in painters:
+            painter.end()
+        first = len(textures)
+        for i, page in enumerate(pages):
+            add_texture(f"atlas_{i}.png", page)
+        for key, (page_index, px, py) in zip(small, placed):
+            where[key] = (first + page_index, [px, py, key[1], key[2]])
+    for key, img in scaled.items():
+        if key not in where:
+            tex = add_texture(f"image_{key[0][:16]}_{key[1]}x{key[2]}.png", img)
+            where[key] = (tex, [0, 0, key[1], key[2]])
+    for entry in entries:
+        key = entry.pop("key", None)
+        if key is not None:
+            entry["texture"], entry["uv"] = where[key]
+
+    layout = {
+        "version": LAYOUT_VERSION,
+        "name": data.get("name", project_path.name),
+        "width": width,
+        "height": height,
+        "textures": textures,
+        # Bottom to top, same as the editor draws them
+        "layers": entries,
+    }
+    (out_dir / LAYOUT_NAME).write_text(json.dumps(layout, separators=(",", ":")))
+    return layout, skipped
+
+
+class ExportJob(QObject):
+    # export_project on a worker thread. Signals arrive on the thread that created the job.
+    finished = Signal(object, object)
+    failed = Signal(str)
+
+    def __init__(self, project_path: Path, out_dir: Path, parent=None):
+        super().__init__(parent)
+        self.project_path = project_path
+        self.out_dir = out_dir
+        self._thread = threading.Thread(target=self._run, name="RuntimeExport", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        try:
+            layout, skipped = export_project(self.project_path, self.out_dir)
+        except (OSError, ValueError) as e:
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(layout, skipped)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export an AWE project for the runtime.")
+    parser.add_argument("project", type=Path)
+    parser.add_argument("--out", type=Path, required=True, help="output directory")
+    parser.add_argument("--page", type=_page_size, default=ATLAS_PAGE_MAX,
+                        help="largest atlas page side, a power of two")
+    parser.add_argument("--padding", type=int, default=ATLAS_PADDING)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtGui import QGuiApplication
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+
+    try:
+        layout, skipped = export_project(args.project, args.out, args.page, args.padding)
+    except (OSError, ValueError) as e:
+        print(f"{args.project}: {e}", file=sys.stderr)
+        return 1
+    print(f"{len(layout['layers'])} layers, {len(layout['textures'])} textures -> {args.out}")
+    for name in skipped:
+        print(f"skipped {name}", file=sys.stderr)
+    return 0
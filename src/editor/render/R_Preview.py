@@ -0,0 +1,99 @@
+import math
+from pathlib import Path
+
+from PySide6.QtGui import QImage
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QBuffer, QByteArray, QIODevice, Signal
+
+from layers.L_Model import LayerStack
+from project.P_Store import write_atomic
+
+
+# Largest size AWE ever shows a preview at (its sidebar); the grid cards are scaled down from this
+PREVIEW_W = 256
+PREVIEW_H = 144
+REGEN_DEBOUNCE_MS = 1500
+
+
+def preview_size(canvas_w: int, canvas_h: int) -> tuple[int, int]:
+    # Cover PREVIEW_W x PREVIEW_H without distorting; AWE crops to fit
+    scale = max(PREVIEW_W / canvas_w, PREVIEW_H / canvas_h)
+    return max(1, math.ceil(canvas_w * scale)), max(1, math.ceil(canvas_h * scale))
+
+
+class _PreviewSignals(QObject):
+    done = Signal(bool)
+
+
+class _PreviewJob(QRunnable):
+
+    def __init__(self, project_path: Path, layers: LayerStack, canvas_w: int, canvas_h: int,
+                 signals: _PreviewSignals):
+        super().__init__()
+        self._project_path = project_path
+        self._layers = layers
+        self._canvas_w = canvas_w
+        self._canvas_h = canvas_h
+        self._signals = signals
+
+    def run(self):
+        # NumPy only gets imported once there's actually something to render
+        from .R_Compositor import Compositor, to_qimage
+
+        w, h = preview_size(self._canvas_w, self._canvas_h)
+        rgba = Compositor(self._project_path, self._layers, self._canvas_w, self._canvas_h).render(w, h)
+        img = to_qimage(rgba).convertToFormat(QImage.Format.Format_RGB32)
+
+        data = QByteArray()
+        buf = QBuffer(data)
+        buf.open(QIODevice.OpenModeFlag.WriteOnly)
+        img.save(buf, "PNG")
+        buf.close()
+        try:
+            # Atomic so AWE's grid never picks up half a PNG
+            write_atomic(self._project_path / "preview.png", bytes(data))
+        except OSError:
+            self._signals.done.emit(False)
+            return
+        self._signals.done.emit(True)
+
+
+class PreviewRegenerator(QObject):
+    # Re-renders preview.png from the real layers a little after the last edit, off the UI thread
+    regenerated = Signal()
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _PreviewSignals(self)
+        self._signals.done.connect(self._on_done)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(REGEN_DEBOUNCE_MS)
+        self._timer.timeout.connect(self._start)
+
+    def schedule(self):
+        self._timer.start()
+
+    def _start(self):
+        res = self._store.data.get("resolution") or {}
+        canvas_w = res.get("width", 1920)
+        canvas_h = res.get("height", 1080)
+        if not canvas_w or not canvas_h:
+            return
+        # Snapshot here on the UI thread (the only one editing) so the worker never sees an edit halfway through
+        layers = LayerStack.from_manifest(self._store.layers.to_manifest())
+        self._pool.start(_PreviewJob(self._store.path, layers, canvas_w, canvas_h, self._signals))
+
+    def flush(self):
+        # Closing with an edit still waiting: render it now and wait for it
+        if self._timer.isActive():
+            self._timer.stop()
+            self._start()
+        self._pool.waitForDone()
+
+    def _on_done(self, ok: bool):
+        if ok:
+            self.regenerated.emit()
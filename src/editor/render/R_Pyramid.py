@@ -0,0 +1,261 @@
+import hashlib
+import math
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+
+from PySide6.QtGui import QImage, QImageReader, QPainter
+from PySide6.QtCore import Qt
+
+from project.P_Canvas import TiledCanvas
+
+
+PYRAMID_TILE = 512
+PYRAMID_MEMORY_BUDGET = 48 * 1024 * 1024
+# What a remembered empty tile counts against the budget, so they can't pile up forever
+_EMPTY_COST = 64
+# Marks a tile that turned out fully empty, so the disk cache can say "nothing here" too
+_EMPTY_SUFFIX = ".none"
+_MISS = object()
+
+
+class TileMemory:
+    # The in-memory LRU for tiles, keyed (pyramid, level, tx, ty). One per view, shared by all its pyramids,
+    # so the budget holds however many images are open.
+
+    def __init__(self, budget_bytes: int = PYRAMID_MEMORY_BUDGET):
+        self._budget = budget_bytes
+        self._used = 0
+        self._tiles: OrderedDict = OrderedDict()
+
+    def get(self, key: tuple):
+        # The tile (None for a known-empty one), or _MISS
+        img = self._tiles.get(key, _MISS)
+        if img is not _MISS:
+            self._tiles.move_to_end(key)
+        return img
+
+    def put(self, key: tuple, img: QImage | None):
+        old = self._tiles.pop(key, _MISS)
+        if old is not _MISS:
+            self._used -= _cost(old)
+        self._tiles[key] = img
+        self._used += _cost(img)
+        while self._used > self._budget and len(self._tiles) > 1:
+            _, evicted = self._tiles.popitem(last=False)
+            self._used -= _cost(evicted)
+
+    def drop(self, owner):
+        for key in [k for k in self._tiles if k[0] is owner]:
+            self._used -= _cost(self._tiles.pop(key))
+
+
+def _cost(img: QImage | None) -> int:
+    return img.sizeInBytes() if img is not None else _EMPTY_COST
+
+
+class TilePyramid:
+    # Level 0 is the source at full size; every level above halves it. Each level is cut into
+    # tile_size tiles, built on demand from the four tiles under it and cached in memory and on disk.
+    # A paint picks the level closest to screen resolution, so a zoomed-out 8K image costs about
+    # what the screen shows, not what the file holds.
+
+    def __init__(self, width: int, height: int, tile_size: int, level0, cache_dir: Path | None = None,
+                 budget_bytes: int = PYRAMID_MEMORY_BUDGET, occupied=None, memory: TileMemory | None = None):
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        # level0(tx, ty) -> QImage or None for an empty tile
+        self._level0 = level0
+        # occupied(level, tx, ty) -> False when nothing at all lives under that tile (sparse sources)
+        self._occupied = occupied
+        self._cache_dir = cache_dir
+        # Shared with the other pyramids on screen when given; otherwise this one gets budget_bytes to itself
+        self._memory = memory if memory is not None else TileMemory(budget_bytes)
+        # Up to the level where the whole image fits in one tile
+        self.levels = 1
+        while max(width, height) > tile_size << (self.levels - 1):
+            self.levels += 1
+
+    @classmethod
+    def for_image(cls, path: Path, cache_root: Path | None = None, load=None,
+                  memory: TileMemory | None = None) -> "TilePyramid | None":
+        # Plain image file (old canvas.png, image layers). The file is only decoded if a level 0
+        # tile is needed that isn't in memory, so a zoomed-out view from a warm disk cache never reads it.
+        # load() can hand over the pixels some cheaper way (the asset store's mmapped cache).
+        size = QImageReader(str(path)).size()
+        if not size.isValid():
+            return None
+        decoded = {}
+        # The decode isn't counted against the budget, so it only lives until every level 0 tile has
+        # been cut from it; the tiles themselves are in the LRU from then on
+        tile_count = math.ceil(size.width() / PYRAMID_TILE) * math.ceil(size.height() / PYRAMID_TILE)
+        cut = set()
+
+        def level0(tx, ty):
+            img = decoded.get("img")
+            if img is None:
+                img = load() if load is not None else QImage(str(path))
+                if img is None or img.isNull():
+                    return None
+                img = decoded["img"] = img.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+                cut.clear()
+            x, y = tx * PYRAMID_TILE, ty * PYRAMID_TILE
+            tile = img.copy(x, y, min(PYRAMID_TILE, size.width() - x), min(PYRAMID_TILE, size.height() - y))
+            cut.add((tx, ty))
+            if len(cut) >= tile_count:
+                decoded.clear()
+            return tile
+
+        return cls(size.width(), size.height(), PYRAMID_TILE, level0, _cache_dir(cache_root, path), memory=memory)
+
+    @classmethod
+    def for_tiles(cls, tiles: TiledCanvas, cache_root: Path | None = None,
+                  memory: TileMemory | None = None) -> "TilePyramid":
+        # Sparse canvas: level 0 is its own tiles, and empty areas are skipped at every level.
+        # level -> set of occupied tiles at that level, built the first time the level is asked about.
+        # Like the disk cache, it's for the tiles as they were when the pyramid was made.
+        by_level = {}
+
+        def occupied(level, tx, ty):
+            at = by_level.get(level)
+            if at is None:
+                at = by_level[level] = {(sx >> level, sy >> level) for sx, sy in tiles.stored}
+            return (tx, ty) in at
+
+        return cls(tiles.width, tiles.height, tiles.tile_size, tiles.load, _cache_dir(cache_root, tiles.root),
+                   occupied=occupied, memory=memory)
+
+    def level_for_scale(self, scale: float) -> int:
+        # Coarsest level that still has at least one source pixel per device pixel
+        if scale >= 1.0:
+            return 0
+        return min(int(math.log2(1.0 / scale)), self.levels - 1)
+
+    def level_size(self, level: int) -> tuple[int, int]:
+        return math.ceil(self.width / (1 << level)), math.ceil(self.height / (1 << level))
+
+    def tiles_in(self, level: int, x: float, y: float, w: float, h: float) -> list:
+        # (tx, ty, level-0 rect) for the level's tiles overlapping a canvas-space rect
+        span = self.tile_size << level
+        tx0 = max(int(x // span), 0)
+        ty0 = max(int(y // span), 0)
+        tx1 = min(int((min(x + w, self.width) - 1) // span), (self.width - 1) // span)
+        ty1 = min(int((min(y + h, self.height) - 1) // span), (self.height - 1) // span)
+        out = []
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                sx, sy = tx * span, ty * span
+                out.append((tx, ty, (sx, sy, min(span, self.width - sx), min(span, self.height - sy))))
+        return out
+
+    def tile(self, level: int, tx: int, ty: int) -> QImage | None:
+        key = (level, tx, ty)
+        img = self._memory.get((self, *key))
+        if img is not _MISS:
+            return img
+        if self._occupied is not None and not self._occupied(level, tx, ty):
+            return None
+        if level == 0:
+            img = self._level0(tx, ty)
+        else:
+            img = self._read_disk(key)
+            if img is False:
+                img = self._build(level, tx, ty)
+                self._write_disk(key, img)
+        self._memory.put((self, *key), img)
+        return img
+
+    def _build(self, level: int, tx: int, ty: int) -> QImage | None:
+        below_w, below_h = self.level_size(level - 1)
+        lw, lh = self.level_size(level)
+        t = self.tile_size
+        out_w = min(t, lw - tx * t)
+        out_h = min(t, lh - ty * t)
+        # The four tiles under this one, stitched at level - 1 and halved
+        src_w = min(2 * t, below_w - 2 * tx * t)
+        src_h = min(2 * t, below_h - 2 * ty * t)
+        merged = None
+        painter = None
+        for dy in (0, 1):
+            for dx in (0, 1):
+                cx, cy = 2 * tx + dx, 2 * ty + dy
+                if cx * t >= below_w or cy * t >= below_h:
+                    continue
+                child = self.tile(level - 1, cx, cy)
+                if child is None:
+                    continue
+                if merged is None:
+                    merged = QImage(src_w, src_h, QImage.Format.Format_ARGB32_Premultiplied)
+                    merged.fill(Qt.GlobalColor.transparent)
+                    painter = QPainter(merged)
+                    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+                painter.drawImage(dx * t, dy * t, child)
+        if merged is None:
+            return None
+        painter.end()
+        return merged.scaled(out_w, out_h, Qt.AspectRatioMode.IgnoreAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+
+    def _tile_path(self, key: tuple) -> Path:
+        level, tx, ty = key
+        return self._cache_dir / str(level) / f"{tx}_{ty}"
+
+    def _read_disk(self, key: tuple):
+        # QImage, None for a known-empty tile, False when it isn't cached
+        if self._cache_dir is None:
+            return False
+        path = self._tile_path(key)
+        if path.with_suffix(_EMPTY_SUFFIX).exists():
+            return None
+        img = QImage(str(path.with_suffix(".png")))
+        if img.isNull():
+            return False
+        return img.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+
+    def _write_disk(self, key: tuple, img: QImage | None):
+        if self._cache_dir is None:
+            return
+        path = self._tile_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if img is None:
+                path.with_suffix(_EMPTY_SUFFIX).touch()
+            else:
+                # Cache only; a torn write just fails to load and gets rebuilt
+                img.save(str(path.with_suffix(".png")), "PNG")
+        except OSError:
+            pass
+
+    def invalidate(self):
+        # Its tiles leave the shared memory; the disk cache stays for a pyramid of the same source
+        self._memory.drop(self)
+
+    @staticmethod
+    def forget(source: Path, cache_root: Path):
+        # Deletes the disk cache of every version of source, for a source that's gone for good
+        shutil.rmtree(_per_source(cache_root, source), ignore_errors=True)
+
+
+def _cache_dir(cache_root: Path | None, source: Path) -> Path | None:
+    # cache_root/<path hash>/<mtime>-<size>: editing the source (or a tile in a tile folder) starts a
+    # fresh pyramid, and the pyramids of its older versions are deleted
+    if cache_root is None:
+        return None
+    try:
+        st = source.stat()
+    except OSError:
+        return None
+    per_source = _per_source(cache_root, source)
+    current = per_source / f"{st.st_mtime_ns}-{st.st_size}"
+    try:
+        for old in per_source.iterdir():
+            if old != current:
+                shutil.rmtree(old, ignore_errors=True)
+    except OSError:
+        pass
+    return current
+
+
+def _per_source(cache_root: Path, source: Path) -> Path:
+    return cache_root / hashlib.sha1(str(source.resolve()).encode()).hexdigest()
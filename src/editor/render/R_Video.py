@@ -0,0 +1,205 @@
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from PySide6.QtGui import QImage
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+
+
+RING_FRAMES = 8
+RING_BUDGET = 64 * 1024 * 1024
+DEFAULT_FPS = 30
+
+
+class FrameRing:
+    # Bounded hand-off between the decode thread and the UI: capped by frame count and bytes.
+    # The decoder blocks when it's full, so a stalled paint loop can't make it run away with memory.
+
+    def __init__(self, max_frames: int = RING_FRAMES, budget_bytes: int = RING_BUDGET):
+        self._frames: deque = deque()
+        self._bytes = 0
+        self._max_frames = max_frames
+        self._budget = budget_bytes
+        self._cond = threading.Condition()
+        self._closed = False
+        self._finished = False
+
+    def put(self, index: int, frame: QImage) -> bool:
+        cost = frame.sizeInBytes()
+        with self._cond:
+            while not self._closed and self._frames and (
+                    len(self._frames) >= self._max_frames or self._bytes + cost > self._budget):
+                self._cond.wait()
+            if self._closed:
+                return False
+            self._frames.append((index, frame))
+            self._bytes += cost
+            return True
+
+    def take_until(self, index: int) -> tuple[int, QImage] | None:
+        # Newest frame at or before index; anything older is dropped unseen
+        best = None
+        with self._cond:
+            while self._frames and self._frames[0][0] <= index:
+                best = self._frames.popleft()
+                self._bytes -= best[1].sizeInBytes()
+            if best is not None:
+                self._cond.notify_all()
+        return best
+
+    def finish(self):
+        # The decoder has nothing more to give
+        with self._cond:
+            self._finished = True
+
+    @property
+    def drained(self) -> bool:
+        with self._cond:
+            return self._finished and not self._frames
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._frames.clear()
+            self._bytes = 0
+            self._cond.notify_all()
+
+
+def _ffmpeg_frames(path: Path, width: int, height: int, fps: float, stop: threading.Event):
+    # ffmpeg does the decode, the frame-rate conversion and the scaling; we just slice raw RGBA
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return
+    frame_bytes = width * height * 4
+    proc = subprocess.Popen(
+        [ffmpeg, "-v", "error", "-nostdin", "-i", str(path),
+         "-vf", f"fps={fps},scale={width}:{height}", "-f", "rawvideo", "-pix_fmt", "rgba", "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while not stop.is_set():
+            data = proc.stdout.read(frame_bytes)
+            if len(data) < frame_bytes:
+                return
+            yield QImage(data, width, height, width * 4, QImage.Format.Format_RGBA8888).copy()
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def _sequence_frames(paths: list[Path], width: int, height: int, stop: threading.Event):
+    for path in paths:
+        if stop.is_set():
+            return
+        img = QImage(str(path))
+        if img.isNull():
+            continue
+        yield img.scaled(width, height, Qt.AspectRatioMode.IgnoreAspectRatio,
+                         Qt.TransformationMode.SmoothTransformation)
+
+
+class VideoPlayer(QObject):
+    # One per video layer on screen. A worker thread decodes pre-scaled frames into the ring; a UI timer
+    # picks whichever frame is due by the wall clock, skipping frames the paint loop didn't get to.
+    frame_ready = Signal()
+    # Why nothing will ever play (no decoder installed); sent once, the player stays idle after it
+    unavailable = Signal(str)
+
+    def __init__(self, video: Path | None = None, frames: list[Path] | None = None,
+                 fps: float | None = None, parent=None):
+        super().__init__(parent)
+        self._video = video
+        self._sequence = frames or []
+        self._fps = fps or DEFAULT_FPS
+        self._size = None
+        self._ring = None
+        self._stop = None
+        self._thread = None
+        self._clock = 0.0
+        self._shown = -1
+        self.current: QImage | None = None
+        self.dropped = 0
+        self._reported = False
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(max(1, int(1000 / self._fps / 2)))
+        self._timer.timeout.connect(self._tick)
+
+    @property
+    def has_size(self) -> bool:
+        return self._size is not None
+
+    def set_size(self, width: int, height: int):
+        # Frames come out at exactly the size they're drawn at; a new size restarts the decode
+        width, height = max(1, width), max(1, height)
+        if self._size == (width, height):
+            return
+        self._size = (width, height)
+        self._restart()
+
+    def _restart(self):
+        self.stop()
+        if self._video is not None and shutil.which("ffmpeg") is None:
+            if not self._reported:
+                self._reported = True
+                self.unavailable.emit("Video layers need ffmpeg, which isn't installed.")
+            return
+        self._ring = FrameRing()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._decode, args=(self._ring, self._stop, *self._size),
+                                        name="VideoDecode", daemon=True)
+        self._thread.start()
+        self._clock = time.perf_counter()
+        self._shown = -1
+        self._timer.start()
+
+    def _frames(self, width: int, height: int, stop: threading.Event):
+        if self._video is not None:
+            return _ffmpeg_frames(self._video, width, height, self._fps, stop)
+        return _sequence_frames(self._sequence, width, height, stop)
+
+    def _decode(self, ring: FrameRing, stop: threading.Event, width: int, height: int):
+        # Frame numbers keep counting across loops so the clock never has to rewind
+        index = 0
+        while not stop.is_set():
+            produced = False
+            frames = self._frames(width, height, stop)
+            try:
+                for frame in frames:
+                    produced = True
+                    if not ring.put(index, frame):
+                        return
+                    index += 1
+            finally:
+                # Kills ffmpeg right away instead of whenever the generator gets collected
+                frames.close()
+            if not produced:
+                # Empty or unreadable source: tell the timer there's nothing coming
+                ring.finish()
+                return
+
+    def _tick(self):
+        due = int((time.perf_counter() - self._clock) * self._fps)
+        taken = self._ring.take_until(due)
+        if taken is None:
+            if self._ring.drained:
+                self._timer.stop()
+            return
+        index, frame = taken
+        if self._shown >= 0:
+            self.dropped += max(0, index - self._shown - 1)
+        self._shown = index
+        self.current = frame
+        self.frame_ready.emit()
+
+    def stop(self):
+        self._timer.stop()
+        if self._stop is not None:
+            self._stop.set()
+            self._ring.close()
+            self._thread.join(timeout=1.0)
+            self._stop = self._ring = self._thread = None
@@ -0,0 +1,15 @@
+from .R_Preview import PreviewRegenerator, PREVIEW_W, PREVIEW_H
+from .R_Pyramid import TilePyramid, TileMemory
+from .R_Video import VideoPlayer
+from .R_Export import export_project, ExportJob, LAYOUT_NAME
+
+
+# The compositor and the audio analysis pull in NumPy; don't pay for that until someone actually asks for it
+def __getattr__(name):
+    if name in ("Compositor", "render_project", "to_qimage", "blend_over"):
+        from . import R_Compositor
+        return getattr(R_Compositor, name)
+    if name in ("AudioAnalyzer", "open_source", "check_wav", "BANDS"):
+        from . import R_Audio
+        return getattr(R_Audio, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
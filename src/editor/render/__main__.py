@@ -0,0 +1,10 @@
+import sys
+
+from .R_Compositor import main
+from .R_Export import main as export_main
+
+
+# python -m render export ... for the runtime export, anything else renders PNGs
+if sys.argv[1:2] == ["export"]:
+    sys.exit(export_main(sys.argv[2:]))
+sys.exit(main())
@@ -0,0 +1,69 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    # No-op unless enable() is called, so the hooks can stay in the startup path for good
+
+    def __init__(self):
+        self.enabled = False
+        self._t0 = 0.0
+        self._out_path = None
+        self._marks: list[tuple[str, float]] = []
+        self._spans: dict[str, float] = {}
+
+    def enable(self, t0: float, out_path: str | None = None):
+        self.enabled = True
+        self._t0 = t0
+        self._out_path = out_path
+
+    def mark(self, name: str, at: float | None = None):
+        if self.enabled:
+            at = time.perf_counter() if at is None else at
+            self._marks.append((name, (at - self._t0) * 1000))
+
+    @contextmanager
+    def span(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._spans[name] = self._spans.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def report(self) -> dict:
+        return {
+            "marks_ms": {name: round(ms, 3) for name, ms in self._marks},
+            "spans_ms": {name: round(ms, 3) for name, ms in self._spans.items()},
+        }
+
+    def finish(self):
+        if not self.enabled:
+            return
+        self.mark("ready")
+        report = self.report()
+        print("Startup profile (ms since process start):", file=sys.stderr)
+        for name, ms in report["marks_ms"].items():
+            print(f"  {name:<24}{ms:>10.1f}", file=sys.stderr)
+        for name, ms in report["spans_ms"].items():
+            print(f"  [{name}]{'':<{22 - len(name)}}{ms:>10.1f}", file=sys.stderr)
+        if self._out_path:
+            with open(self._out_path, "w") as f:
+                json.dump(report, f, indent=2)
+
+
+def parse_profile_flag(argv: list[str]) -> tuple[bool, str | None]:
+    # --profile-startup or --profile-startup=out.json
+    for arg in argv:
+        if arg == "--profile-startup":
+            return True, None
+        if arg.startswith("--profile-startup="):
+            return True, arg.split("=", 1)[1] or None
+    return False, None
+
+
+startup = StartupProfiler()
@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# Enough for a long session; the oldest events fall off first
+MAX_EVENTS = 200_000
+FRAME_WINDOW = 120
+
+
+class Tracer:
+    # Opt-in like the startup profiler: every hook is a flag check until enable() is called.
+    # Events are Chrome trace "complete" events, so a dump opens straight in chrome://tracing or Perfetto.
+
+    def __init__(self):
+        self.enabled = False
+        self._out_path = None
+        self._t0 = 0.0
+        self._events: deque = deque(maxlen=MAX_EVENTS)
+        self._frames: deque = deque(maxlen=FRAME_WINDOW)
+        self._pid = os.getpid()
+
+    def enable(self, out_path: str | None = None):
+        self.enabled = True
+        self._out_path = out_path
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, cat: str = "editor"):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, cat, start, time.perf_counter())
+
+    def record(self, name: str, cat: str, start: float, end: float):
+        # deque.append is atomic, so the save thread can record without a lock
+        self._events.append({
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round((start - self._t0) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+        })
+
+    def frame(self, ms: float):
+        if self.enabled:
+            self._frames.append(ms)
+
+    def frame_stats(self) -> tuple[float, float, float] | None:
+        # (last, average, worst) over the recent frames, in ms
+        if not self._frames:
+            return None
+        frames = list(self._frames)
+        return frames[-1], sum(frames) / len(frames), max(frames)
+
+    def dump(self, path: str):
+        events = list(self._events)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"Trace: {len(events)} events written to {path}", file=sys.stderr)
+
+    def finish(self):
+        if self.enabled:
+            self.dump(self._out_path or "awe-trace.json")
+
+
+def parse_trace_flag(argv: list[str]) -> tuple[bool, str | None]:
+    # --trace or --trace=out.json
+    for arg in argv:
+        if arg == "--trace":
+            return True, None
+        if arg.startswith("--trace="):
+            return True, arg.split("=", 1)[1] or None
+    return False, None
+
+
+trace = Tracer()
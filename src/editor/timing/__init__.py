@@ -0,0 +1,2 @@
+from .T_Startup import StartupProfiler, startup, parse_profile_flag
+from .T_Trace import Tracer, trace, parse_trace_flag